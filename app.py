@@ -9,41 +9,179 @@ from gevent import monkey
 monkey.patch_all()
 
 import os
-import json
+import functools
+import logging
 import re
-from datetime import datetime
-from flask import Flask, render_template, request, jsonify, send_from_directory
+import threading
+import orjson
+from flask import Flask, Response, render_template, request, jsonify, send_from_directory
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+from flask_compress import Compress
 from flask_cors import CORS
+from werkzeug.exceptions import NotFound
 from flask_socketio import SocketIO, emit, join_room, leave_room
 from dotenv import load_dotenv
 from azure.ai.projects import AIProjectClient
-from azure.identity import DefaultAzureCredential
-from azure.ai.agents.models import ListSortOrder
+from azure.identity import DefaultAzureCredential, ManagedIdentityCredential
+from azure.ai.agents.models import AgentThreadCreationOptions, ListSortOrder, ThreadMessageOptions
 
 # Load environment variables
 load_dotenv()
 
+# Debug output is off by default; set LOG_LEVEL=DEBUG to see it
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'WARNING').upper())
+logger = logging.getLogger(__name__)
+
 # Import our restaurant recommendation function
 from food_restaurant_vibe import get_restaurants_by_mood
 # Note: asyncio may conflict with eventlet, only import if needed
 # import asyncio
 from services.session_generator import generate_room_id
-from services.lobby_manager import lobby_manager
+from services.lobby_manager import NOT_HOST_ERROR, lobby_manager
+from services.search_cache import search_cache
+from services.restaurant_converter import convert_azure_to_ui_format
 
-app = Flask(__name__, static_folder='frontend/dist', static_url_path='')
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson, used by jsonify and request.get_json."""
+    
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj).decode()
+    
+    def dumps_bytes(self, obj):
+        # Fall back to Flask's encoder for types orjson doesn't handle (e.g. Decimal)
+        return orjson.dumps(obj, default=DefaultJSONProvider.default, option=orjson.OPT_NON_STR_KEYS)
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype='application/json')
+
+# Flask's own static route is disabled: at the site root it would match every path
+# before serve_react_app, which sets cache headers and falls back to index.html
+app = Flask(__name__, static_folder=None)
+app.json = OrjsonProvider(app)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
 
 # Enable CORS for all routes
 CORS(app, resources={r"/*": {"origins": "*"}})
 
+# Compress JSON API responses; search results repeat keys and URLs and shrink several-fold
+app.config['COMPRESS_MIMETYPES'] = ['application/json']
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 1024
+Compress(app)
+
 # Initialize SocketIO with gevent (supports WebSockets)
 socketio = SocketIO(app, cors_allowed_origins="*", async_mode='gevent')
 
-# In-memory store for existing rooms (in production, use a database)
-existing_rooms = set()
+# Built React app
+FRONTEND_DIST = os.path.join(app.root_path, 'frontend', 'dist')
+
+# Files in the built React app, snapshotted at startup since dist only changes on deploy
+STATIC_FILES = frozenset(
+    os.path.relpath(os.path.join(root, name), FRONTEND_DIST).replace(os.sep, '/')
+    for root, _, files in os.walk(FRONTEND_DIST)
+    for name in files
+)
+
+# Vite content-hashes everything under assets/, so those files can be cached for a year
+ASSET_MAX_AGE = 31536000
+
+def _read_index_html():
+    """Read the built index.html, or None if the frontend hasn't been built."""
+    if 'index.html' not in STATIC_FILES:
+        return None
+    with open(os.path.join(FRONTEND_DIST, 'index.html'), 'rb') as f:
+        return f.read()
+
+# index.html is small and requested on every page load, so keep it in memory
+INDEX_HTML = _read_index_html()
+
 # Track socket session -> lobby/player to handle disconnects cleanly
 socket_sessions = {}
 
+# Azure AI project client and agent, created on first use and shared across requests.
+# Settings are read from the environment once at startup.
+AZURE_ENDPOINT = os.environ.get('AZURE_AI_ENDPOINT', 'https://mit-pocs.services.ai.azure.com/api/projects/restaurantRoulette')
+AZURE_AGENT_ID = os.environ.get('AZURE_AI_AGENT_ID', 'asst_Z4caeSU57XRTlBQwdE7BaRD2')
+azure_project = None
+azure_agent = None
+azure_lock = threading.Lock()
+
+# One credential for the whole process so its access token is reused until expiry.
+# When hosted in Azure (IDENTITY_ENDPOINT/MSI_ENDPOINT are set) managed identity is
+# always the credential that wins, so use it directly instead of walking the chain,
+# with AZURE_CLIENT_ID selecting a user-assigned identity as DefaultAzureCredential does.
+# Otherwise only environment, workload/managed identity and Azure CLI sign-in are
+# used here, so the remaining developer-tool credentials are skipped.
+if os.environ.get('IDENTITY_ENDPOINT') or os.environ.get('MSI_ENDPOINT'):
+    azure_credential = ManagedIdentityCredential(client_id=os.environ.get('AZURE_CLIENT_ID'))
+else:
+    azure_credential = DefaultAzureCredential(
+        exclude_shared_token_cache_credential=True,
+        exclude_visual_studio_code_credential=True,
+        exclude_powershell_credential=True,
+        exclude_developer_cli_credential=True,
+    )
+
+# JSON array or object in a ```json``` or ``` block, compiled once at import.
+# The body can't contain a backtick, so matching stops at the closing fence
+# without backtracking.
+JSON_BLOCK_PATTERN = re.compile(r'```(?:json)?\s*(\[[^`]*\]|\{[^`]*\})\s*```')
+
+# Opening JSON bracket -> its closing bracket
+JSON_CLOSERS = {'[': ']', '{': '}'}
+
+def _find_json_spans(text: str):
+    """
+    Find the outermost balanced JSON array and object spans in text, in one pass.
+    Brackets inside JSON string literals are ignored, and a closing bracket that
+    doesn't match the innermost open one discards the brackets still open.
+    
+    Returns:
+        List of (start, end) slice bounds, in order, none nested inside another
+    """
+    spans = []
+    stack = []
+    in_string = False
+    escaped = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch in JSON_CLOSERS:
+            stack.append(i)
+        elif not stack:
+            # Quotes outside any brackets are prose, not JSON strings
+            continue
+        elif ch == '"':
+            in_string = True
+        elif ch in ']}':
+            begin = stack.pop()
+            if JSON_CLOSERS[text[begin]] == ch:
+                spans.append((begin, i + 1))
+            else:
+                stack.clear()
+    # Keep only the outermost spans; spans end in order, so sort them by start
+    spans.sort()
+    outermost = []
+    for begin, end in spans:
+        if not outermost or begin >= outermost[-1][1]:
+            outermost.append((begin, end))
+    return outermost
+
+def _is_restaurant_json(value) -> bool:
+    """True for a JSON object or a non-empty array of objects, the shapes the agent replies with."""
+    if isinstance(value, list):
+        return bool(value) and all(isinstance(item, dict) for item in value)
+    return isinstance(value, dict)
+
 def extract_json_from_text(text: str):
     """
     Extract JSON from text response. Handles JSON that might be embedded in markdown code blocks or plain text.
@@ -54,33 +192,99 @@ def extract_json_from_text(text: str):
     
     Returns:
         Parsed JSON object/array or None if extraction fails
+    
+    A bare object is returned whole even when a bracket follows it, and bracketed
+    citations are not mistaken for the reply:
+    
+    >>> extract_json_from_text('Here is my pick:\\n{"name": "Thai Palace", "categories": ["Thai", "Spicy"], "reviews": []}\\nSources: [1]')
+    {'name': 'Thai Palace', 'categories': ['Thai', 'Spicy'], 'reviews': []}
+    >>> extract_json_from_text('Here are six picks from Yelp [1]:\\n[{"name": "Thai Palace"}, {"name": "Cafe Luna"}]')
+    [{'name': 'Thai Palace'}, {'name': 'Cafe Luna'}]
     """
-    # Try to find JSON in code blocks first (both objects and arrays)
-    json_patterns = [
-        r'```json\s*(\[.*?\])\s*```',  # JSON array in ```json``` blocks
-        r'```json\s*(\{.*?\})\s*```',  # JSON object in ```json``` blocks
-        r'```\s*(\[.*?\])\s*```',      # JSON array in ``` blocks
-        r'```\s*(\{.*?\})\s*```',      # JSON object in ``` blocks
-        r'(\[.*\])',                    # Any JSON array
-        r'(\{.*\})',                    # Any JSON object
-    ]
+    # No brackets means no JSON object or array to find
+    if '{' not in text and '[' not in text:
+        return None
+
+    # Fast path: the whole response is JSON
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        pass
     
-    for pattern in json_patterns:
-        matches = re.findall(pattern, text, re.DOTALL)
-        for match in matches:
+    # Try to find JSON in code blocks (both objects and arrays), skipping the
+    # regex entirely when the response has no fences
+    if '```' in text:
+        for match in JSON_BLOCK_PATTERN.finditer(text):
             try:
-                return json.loads(match)
-            except json.JSONDecodeError:
+                return orjson.loads(match.group(1))
+            except orjson.JSONDecodeError:
                 continue
     
-    # Try parsing the entire text as JSON
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        pass
+    # Fall back to the slice from the first opening bracket to the last matching
+    # closing bracket, as a single bare JSON value usually spans it
+    start = min(i for i in (text.find('['), text.find('{')) if i != -1)
+    end = text.rfind(JSON_CLOSERS[text[start]])
+    if end > start:
+        try:
+            data = orjson.loads(text[start:end + 1])
+            if _is_restaurant_json(data):
+                return data
+        except orjson.JSONDecodeError:
+            pass
+    
+    # Otherwise take the first outermost balanced span holding restaurant-shaped JSON.
+    # Spans nested inside one that was tried are skipped, e.g. a [1] citation isn't
+    # taken for the reply and a broken object's categories array isn't returned.
+    for begin, end in _find_json_spans(text):
+        try:
+            data = orjson.loads(text[begin:end])
+        except orjson.JSONDecodeError:
+            continue
+        if _is_restaurant_json(data):
+            return data
     
     return None
 
+def get_azure_agent():
+    """
+    Get the shared Azure AI Project Client and agent, creating them on first use.
+    
+    Returns:
+        Tuple of (project client, agent)
+    """
+    global azure_project, azure_agent
+    if azure_agent is None:
+        with azure_lock:
+            if azure_agent is None:
+                project = AIProjectClient(
+                    credential=azure_credential,
+                    endpoint=AZURE_ENDPOINT
+                )
+                azure_agent = project.agents.get_agent(AZURE_AGENT_ID)
+                azure_project = project
+    return azure_project, azure_agent
+
+def warm_up_azure():
+    """Create the shared Azure client and agent ahead of the first search."""
+    try:
+        get_azure_agent()
+    except Exception as e:
+        logger.warning("Azure warm-up failed, will retry on first search: %s", e)
+
+azure_warm_up_started = False
+
+@app.before_request
+def start_azure_warm_up():
+    """
+    Fetch the token, open the TLS connection and look up the agent in the background
+    on the first request (usually the page load), so the first user search doesn't pay
+    for it. Importing the app, e.g. in the debug reloader's parent process, stays offline.
+    """
+    global azure_warm_up_started
+    if not azure_warm_up_started:
+        azure_warm_up_started = True
+        threading.Thread(target=warm_up_azure, daemon=True).start()
+
 def call_new_azure_agent(location: str, mood: str):
     """
     Call the new simplified Azure AI Agent and get restaurant recommendations.
@@ -93,31 +297,18 @@ def call_new_azure_agent(location: str, mood: str):
         Dictionary with success status and parsed JSON data or error message
     """
     try:
-        # Initialize Azure AI Project Client
-        project = AIProjectClient(
-            credential=DefaultAzureCredential(),
-            endpoint="https://mit-pocs.services.ai.azure.com/api/projects/restaurantRoulette"
-        )
-        
-        # Get the agent
-        agent = project.agents.get_agent("asst_Z4caeSU57XRTlBQwdE7BaRD2")
-        
-        # Create a new thread
-        thread = project.agents.threads.create()
+        # Reuse the shared Azure AI Project Client and agent
+        project, agent = get_azure_agent()
         
         # Create user message with location and mood - explicitly request reviews
         user_message = f"Find 6 restaurants in {location} that match a {mood} mood. Include 2 real reviews for each restaurant with reviewer names and source URLs."
         
-        message = project.agents.messages.create(
-            thread_id=thread.id,
-            role="user",
-            content=user_message
-        )
-        
-        # Run the agent and process
-        run = project.agents.runs.create_and_process(
-            thread_id=thread.id,
-            agent_id=agent.id
+        # Create a fresh thread with the message and run the agent in a single request
+        run = project.agents.create_thread_and_process_run(
+            agent_id=agent.id,
+            thread=AgentThreadCreationOptions(
+                messages=[ThreadMessageOptions(role="user", content=user_message)]
+            )
         )
         
         # Check if run failed
@@ -127,15 +318,15 @@ def call_new_azure_agent(location: str, mood: str):
                 "error": f"Run failed: {run.last_error}"
             }
         
-        # Get messages and extract assistant response
+        # Get messages newest-first so the assistant reply is usually on the first page
         messages = project.agents.messages.list(
-            thread_id=thread.id, 
-            order=ListSortOrder.ASCENDING
+            thread_id=run.thread_id, 
+            order=ListSortOrder.DESCENDING
         )
         
         # Find the assistant's response (last non-user message)
         assistant_response = None
-        for message in reversed(list(messages)):
+        for message in messages:
             if message.role == "assistant" and message.text_messages:
                 assistant_response = message.text_messages[-1].text.value
                 break
@@ -150,15 +341,15 @@ def call_new_azure_agent(location: str, mood: str):
         json_data = extract_json_from_text(assistant_response)
         
         # Debug logging to help diagnose review issues
-        if json_data:
-            print(f"[DEBUG] Successfully extracted JSON with {len(json_data) if isinstance(json_data, list) else 'object'} items")
+        if json_data and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Successfully extracted JSON with %s items", len(json_data) if isinstance(json_data, list) else 'object')
             if isinstance(json_data, list) and len(json_data) > 0:
                 first_restaurant = json_data[0]
                 has_reviews = "reviews" in first_restaurant if isinstance(first_restaurant, dict) else False
-                print(f"[DEBUG] First restaurant has reviews field: {has_reviews}")
+                logger.debug("First restaurant has reviews field: %s", has_reviews)
                 if has_reviews and isinstance(first_restaurant, dict):
                     reviews_count = len(first_restaurant.get("reviews", []))
-                    print(f"[DEBUG] First restaurant has {reviews_count} reviews")
+                    logger.debug("First restaurant has %d reviews", reviews_count)
         
         if json_data:
             return {
@@ -182,169 +373,66 @@ def call_new_azure_agent(location: str, mood: str):
             "error": f"Error calling Azure agent: {str(e)}"
         }
 
-def convert_azure_to_ui_format(azure_result):
-    """Convert Azure AI result (with JSON data) to UI-compatible format."""
-    if not azure_result.get("success"):
-        return {
-            "success": False,
-            "error": azure_result.get("error", "Unknown error")
-        }
-    
-    json_data = azure_result.get("json_data", {})
-    location = azure_result.get("location", "Unknown")
-    mood = azure_result.get("mood", "Unknown")
-    
-    restaurants = []
-    
-    # Handle different possible JSON structures from the agent
-    # The agent might return a list of restaurants or an object with a restaurants key
-    restaurant_list = []
-    if isinstance(json_data, list):
-        restaurant_list = json_data
-    elif isinstance(json_data, dict):
-        # Try common keys
-        restaurant_list = json_data.get("restaurants", json_data.get("restaurant_list", []))
-        # If it's a single restaurant object, wrap it in a list
-        if not restaurant_list and "name" in json_data:
-            restaurant_list = [json_data]
-    
-    # Process each restaurant from the JSON
-    for i, restaurant_data in enumerate(restaurant_list):
-        if not isinstance(restaurant_data, dict):
-            continue
-        
-        # Extract restaurant information
-        name = restaurant_data.get("name", restaurant_data.get("restaurant_name", f"Restaurant {i+1}"))
-        address = restaurant_data.get("address", restaurant_data.get("location", location))
-        cuisine = restaurant_data.get("cuisine", restaurant_data.get("cuisine_type", "Various"))
-        price_range = restaurant_data.get("price_range", restaurant_data.get("price", "$$"))
-        rating = restaurant_data.get("rating", restaurant_data.get("rating_score", 4.0))
-        description = restaurant_data.get("description", restaurant_data.get("summary", ""))
-        
-        # Extract reviews - handle different possible structures
-        reviews = []
-        reviews_data = restaurant_data.get("reviews", [])
-        
-        # Try multiple possible keys for reviews
-        if not reviews_data:
-            reviews_data = restaurant_data.get("review", restaurant_data.get("review_list", []))
-        
-        if isinstance(reviews_data, list):
-            for review_item in reviews_data:
-                if isinstance(review_item, dict):
-                    # Try multiple possible keys for review text
-                    review_text = (review_item.get("text") or 
-                                 review_item.get("review") or 
-                                 review_item.get("content") or 
-                                 review_item.get("review_text") or
-                                 review_item.get("snippet") or "")
-                    
-                    # Try multiple possible keys for reviewer name
-                    reviewer_name = (review_item.get("user_name") or 
-                                    review_item.get("reviewer") or 
-                                    review_item.get("name") or 
-                                    review_item.get("author") or
-                                    review_item.get("reviewer_name") or
-                                    "Anonymous")
-                    
-                    # Try multiple possible keys for URL
-                    review_url = (review_item.get("url") or 
-                                review_item.get("source_url") or 
-                                review_item.get("link") or
-                                review_item.get("source") or
-                                restaurant_data.get("url", "https://google.com"))
-                    
-                    review_rating = review_item.get("rating", review_item.get("review_rating", 4))
-                    
-                    if review_text and len(review_text.strip()) > 0:
-                        reviews.append({
-                            "user_name": reviewer_name,
-                            "rating": float(review_rating) if review_rating else 4,
-                            "text": review_text.strip(),
-                            "source": "Restaurant Review",
-                            "url": review_url,
-                            "time_created": (review_item.get("date") or 
-                                           review_item.get("time_created") or 
-                                           review_item.get("created_at") or
-                                           datetime.now().strftime("%Y-%m-%d"))
-                        })
-                elif isinstance(review_item, str) and len(review_item.strip()) > 0:
-                    # If review is just a string
-                    reviews.append({
-                        "user_name": "Customer Review",
-                        "rating": 4,
-                        "text": review_item.strip(),
-                        "source": "Restaurant Review",
-                        "url": restaurant_data.get("url", "https://google.com"),
-                        "time_created": datetime.now().strftime("%Y-%m-%d")
-                    })
-        
-        # If no reviews found, add a default one (but log it for debugging)
-        if not reviews:
-            print(f"[WARNING] No reviews found for restaurant: {name}")
-            reviews.append({
-                "user_name": "Customer Review",
-                "rating": 4,
-                "text": description or f"This restaurant matches your '{mood}' mood perfectly.",
-                "source": "Restaurant Review",
-                "url": restaurant_data.get("url", "https://google.com"),
-                "time_created": datetime.now().strftime("%Y-%m-%d")
-            })
-        
-        # Create restaurant object
-        restaurant = {
-            "id": f"azure_{i}",
-            "name": name,
-            "cuisine": cuisine,
-            "price_range": price_range if price_range in ["$", "$$", "$$$", "$$$$"] else "$$",
-            "rating": float(rating) if rating else 4.0,
-            "review_count": len(reviews),
-            "address": address,
-            "phone": restaurant_data.get("phone", restaurant_data.get("phone_number", "N/A")),
-            "url": restaurant_data.get("url", restaurant_data.get("website", "https://google.com")),
-            "image_url": restaurant_data.get("image_url", restaurant_data.get("image", "https://via.placeholder.com/300x200?text=Restaurant")),
-            "coordinates": restaurant_data.get("coordinates", {
-                "latitude": restaurant_data.get("latitude", 40.5),
-                "longitude": restaurant_data.get("longitude", -74.4)
-            }),
-            "categories": restaurant_data.get("categories", [cuisine] if cuisine != "Various" else ["Restaurant"]),
-            "mood_match": description or f"This restaurant matches your '{mood}' mood perfectly.",
-            "reviews": reviews
-        }
-        restaurants.append(restaurant)
-    
-    return {
-        "success": True,
-        "location": location,
-        "mood": mood,
-        "total_restaurants": len(restaurants),
-        "restaurants": restaurants,
-        "timestamp": datetime.now().isoformat()
-    }
+def normalize_lobby_id(lobby_id) -> str:
+    """Lobby IDs are stored uppercase; normalize user input once where it enters the app."""
+    return (lobby_id or '').strip().upper()
+
+def normalize_lobby(handler):
+    """Normalize data['lobby_id'] before a WebSocket handler runs."""
+    @functools.wraps(handler)
+    def wrapper(data):
+        data['lobby_id'] = normalize_lobby_id(data.get('lobby_id'))
+        return handler(data)
+    return wrapper
+
+def serve_index():
+    """Serve the React entry point, revalidated on every load so new builds are picked up."""
+    if INDEX_HTML is None:
+        return send_from_directory(FRONTEND_DIST, 'index.html')
+    return Response(INDEX_HTML, mimetype='text/html', headers={'Cache-Control': 'no-cache'})
 
 @app.route('/')
 def index():
     """Serve React app."""
-    return send_from_directory(app.static_folder, 'index.html')
+    return serve_index()
 
 # Catch-all route to serve React app for client-side routing
 @app.route('/<path:path>')
 def serve_react_app(path):
     """Serve React app for client-side routing."""
-    # Check if the path is a file that exists
-    if path and os.path.exists(os.path.join(app.static_folder, path)):
-        return send_from_directory(app.static_folder, path)
+    # Check if the path is a file in the build output
+    if path in STATIC_FILES and path != 'index.html':
+        max_age = ASSET_MAX_AGE if path.startswith('assets/') else None
+        # send_from_directory already checks the file exists, so no separate stat;
+        # it only raises if the build changed since startup
+        try:
+            return send_from_directory(FRONTEND_DIST, path, max_age=max_age)
+        except NotFound:
+            pass
     # Otherwise, serve index.html for client-side routing
-    return send_from_directory(app.static_folder, 'index.html')
+    return serve_index()
 
-if __name__ == '__main__':
-    socketio.run(app, debug=True, host='0.0.0.0', port=5000)
+# Search requests only carry a location and mood; larger bodies are rejected unparsed
+MAX_SEARCH_BODY_BYTES = 4096
 
 @app.route('/api/search', methods=['POST'])
 def search_restaurants():
     """API endpoint: Search for restaurants based on location and mood using Azure AI."""
     try:
-        data = request.get_json()
+        if request.content_length and request.content_length > MAX_SEARCH_BODY_BYTES:
+            return jsonify({
+                'success': False,
+                'error': 'Request body too large'
+            }), 413
+        
+        # Empty or malformed bodies are rejected before any search work
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({
+                'success': False,
+                'error': 'Request body must be a JSON object with location and mood'
+            }), 400
+        
         location = data.get('location', '').strip()
         mood = data.get('mood', '').strip()
         
@@ -354,11 +442,13 @@ def search_restaurants():
                 'error': 'Both location and mood are required'
             }), 400
         
-        # Use new simplified Azure AI agent to get restaurant recommendations
-        azure_result = call_new_azure_agent(location, mood)
-        
-        # Convert Azure result to UI format
-        restaurant_data = convert_azure_to_ui_format(azure_result)
+        # Use new simplified Azure AI agent to get restaurant recommendations and
+        # convert them to UI format, reusing a recent result for the same location and mood
+        # (empty results are not cached, so the next search retries the agent)
+        restaurant_data = search_cache.get_or_compute(
+            location, mood,
+            lambda: convert_azure_to_ui_format(call_new_azure_agent(location, mood))
+        )
         
         return jsonify(restaurant_data)
             
@@ -381,9 +471,10 @@ def create_lobby():
                 'error': 'host_id is required'
             }), 400
         
-        # Generate unique lobby ID
-        lobby_id = generate_room_id(existing_rooms)
-        existing_rooms.add(lobby_id)
+        # Generate lobby ID, retrying in the unlikely case it is already in use
+        lobby_id = generate_room_id()
+        while lobby_manager.get_lobby(lobby_id):
+            lobby_id = generate_room_id()
         
         # Create lobby
         lobby = lobby_manager.create_lobby(lobby_id, host_id)
@@ -403,33 +494,33 @@ def create_lobby():
 def join_lobby():
     """Join an existing lobby."""
     try:
-        print(f"[DEBUG] Join lobby request received")
+        logger.debug("Join lobby request received")
         data = request.get_json()
-        print(f"[DEBUG] Request data: {data}")
+        logger.debug("Request data: %s", data)
         
-        lobby_id = data.get('lobby_id', '').strip().upper()
+        lobby_id = normalize_lobby_id(data.get('lobby_id'))
         player_id = data.get('player_id')
         
         if not lobby_id:
-            print(f"[DEBUG] Missing lobby_id")
+            logger.debug("Missing lobby_id")
             return jsonify({
                 'success': False,
                 'error': 'Lobby ID is required'
             }), 400
         
         if not player_id:
-            print(f"[DEBUG] Missing player_id")
+            logger.debug("Missing player_id")
             return jsonify({
                 'success': False,
                 'error': 'player_id is required'
             }), 400
         
-        print(f"[DEBUG] Attempting to join lobby {lobby_id} with player {player_id}")
+        logger.debug("Attempting to join lobby %s with player %s", lobby_id, player_id)
         success, lobby, error = lobby_manager.join_lobby(lobby_id, player_id)
-        print(f"[DEBUG] Join result: success={success}, error={error}")
+        logger.debug("Join result: success=%s, error=%s", success, error)
         
         if success:
-            print(f"[DEBUG] Successfully joined lobby, returning response")
+            logger.debug("Successfully joined lobby, returning response")
             return jsonify({
                 'success': True,
                 'lobby_id': lobby_id,
@@ -441,15 +532,13 @@ def join_lobby():
                 'mood': lobby.mood
             })
         else:
-            print(f"[DEBUG] Failed to join: {error}")
+            logger.debug("Failed to join: %s", error)
             return jsonify({
                 'success': False,
                 'error': error or 'Failed to join lobby'
             }), 400
     except Exception as e:
-        print(f"[DEBUG] Exception in join_lobby: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Exception in join_lobby: %s", e)
         return jsonify({
             'success': False,
             'error': f'Error joining lobby: {str(e)}'
@@ -459,7 +548,7 @@ def join_lobby():
 def get_lobby_info(lobby_id):
     """Get lobby information."""
     try:
-        info = lobby_manager.get_lobby_info(lobby_id.upper())
+        info = lobby_manager.get_lobby_info(normalize_lobby_id(lobby_id))
         if info:
             return jsonify({
                 'success': True,
@@ -489,7 +578,7 @@ def handle_disconnect():
     if session_info:
         lobby_id = session_info.get('lobby_id')
         player_id = session_info.get('player_id', request.sid)
-        print(f"[INFO] Socket disconnected: sid={request.sid}, player={player_id}, lobby={lobby_id}")
+        logger.info("Socket disconnected: sid=%s, player=%s, lobby=%s", request.sid, player_id, lobby_id)
         if lobby_id:
             leave_room(lobby_id)
             lobby_manager.leave_lobby(lobby_id, player_id)
@@ -500,12 +589,13 @@ def handle_disconnect():
                     'player_count': len(lobby.players)
                 }, room=lobby_id)
     else:
-        print(f"[INFO] Socket disconnected: sid={request.sid} (no lobby mapping)")
+        logger.info("Socket disconnected: sid=%s (no lobby mapping)", request.sid)
 
 @socketio.on('join_lobby')
+@normalize_lobby
 def handle_join_lobby(data):
     """Handle client joining a lobby room."""
-    lobby_id = data.get('lobby_id', '').upper()
+    lobby_id = data['lobby_id']
     player_id = data.get('player_id')
     
     if not lobby_id:
@@ -516,27 +606,18 @@ def handle_join_lobby(data):
         emit('error', {'message': 'Player ID required'})
         return
     
-    lobby = lobby_manager.get_lobby(lobby_id)
+    # Look up the lobby and add the player if not already there, in one step
+    lobby, error = lobby_manager.join_or_attach(lobby_id, player_id)
     if not lobby:
-        emit('error', {'message': 'Lobby not found'})
+        emit('error', {'message': error or 'Failed to join lobby'})
         return
     
-    # Join the SocketIO room first (this is immediate)
     join_room(lobby_id)
     socket_sessions[request.sid] = {
         'lobby_id': lobby_id,
         'player_id': player_id,
     }
     
-    # Add player to lobby if not already there
-    if player_id not in lobby.players:
-        success, lobby, error = lobby_manager.join_lobby(lobby_id, player_id)
-        if not success:
-            emit('error', {'message': error or 'Failed to join lobby'})
-            return
-        # Refresh lobby reference after join
-        lobby = lobby_manager.get_lobby(lobby_id)
-    
     # Notify others in the lobby
     emit('player_joined', {
         'player_id': player_id,
@@ -560,9 +641,10 @@ def handle_join_lobby(data):
     })
 
 @socketio.on('leave_lobby')
+@normalize_lobby
 def handle_leave_lobby(data):
     """Handle client leaving a lobby room."""
-    lobby_id = data.get('lobby_id', '').upper()
+    lobby_id = data['lobby_id']
     player_id = data.get('player_id', request.sid)
     
     if lobby_id:
@@ -580,9 +662,10 @@ def handle_leave_lobby(data):
             }, room=lobby_id)
 
 @socketio.on('host_spin')
+@normalize_lobby
 def handle_host_spin(data):
     """Handle host spinning the roulette."""
-    lobby_id = data.get('lobby_id', '').upper()
+    lobby_id = data['lobby_id']
     host_id = data.get('host_id')
     restaurants = data.get('restaurants', [])
     selected_restaurant = data.get('selected_restaurant')
@@ -597,20 +680,7 @@ def handle_host_spin(data):
         emit('error', {'message': 'Host ID required'})
         return
     
-    # Verify this is the host
-    lobby = lobby_manager.get_lobby(lobby_id)
-    if not lobby:
-        emit('error', {'message': 'Lobby not found'})
-        return
-    
-    if lobby.host_id != host_id:
-        emit('error', {'message': 'Only the host can spin'})
-        return
-    
-    # Ensure host is in the SocketIO room (in case of reconnection)
-    join_room(lobby_id)
-    
-    # Update lobby state
+    # Update lobby state (this also verifies the lobby exists and this is the host)
     success, error = lobby_manager.update_lobby_state(
         lobby_id, host_id,
         restaurants=restaurants,
@@ -620,6 +690,9 @@ def handle_host_spin(data):
     )
     
     if success:
+        # Ensure host is in the SocketIO room (in case of reconnection)
+        join_room(lobby_id)
+        
         # Broadcast to all players in the lobby
         # Use socketio.emit to broadcast to the entire room
         socketio.emit('spin_result', {
@@ -628,5 +701,11 @@ def handle_host_spin(data):
             'location': location,
             'mood': mood
         }, room=lobby_id, include_self=True)
+    elif error == NOT_HOST_ERROR:
+        emit('error', {'message': 'Only the host can spin'})
     else:
         emit('error', {'message': error or 'Failed to update lobby state'})
+
+if __name__ == '__main__':
+    # Debugger and reloader are opt-in for local development (FLASK_DEBUG=1)
+    socketio.run(app, debug=os.environ.get('FLASK_DEBUG') == '1', host='0.0.0.0', port=5000)
@@ -4,7 +4,7 @@ import os
 from typing import Optional, Union, List, Dict, Any
 from contextlib import AsyncExitStack
 
-from mcp import ClientSession, StdioServerParameters
+from mcp import ClientSession, StdioServerParameters, types
 from mcp.client.stdio import stdio_client
 import google.generativeai as genai
 from google.generativeai.types import FunctionDeclaration
@@ -15,7 +15,7 @@ load_dotenv()
 # Configure Gemini API key
 genai.configure(api_key=os.environ.get("GOOGLE_API_KEY"))
 
-UNSUPPORTED_GEMINI_KEYWORDS = ["title", "additionalProperties", "default"]
+UNSUPPORTED_GEMINI_KEYWORDS = frozenset(("title", "additionalProperties", "default"))
 
 def _clean_schema_for_gemini(schema: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -26,14 +26,13 @@ def _clean_schema_for_gemini(schema: Dict[str, Any]) -> Dict[str, Any]:
         if "anyOf" in schema:
             return {"type": "object", "description": "This parameter has a union type."}
 
-        cleaned_schema = {}
-        for key, value in schema.items():
-            if key in UNSUPPORTED_GEMINI_KEYWORDS:
-                continue
-            cleaned_schema[key] = _clean_schema_for_gemini(value)
-        return cleaned_schema
+        return {
+            key: value if not isinstance(value, (dict, list)) else _clean_schema_for_gemini(value)
+            for key, value in schema.items()
+            if key not in UNSUPPORTED_GEMINI_KEYWORDS
+        }
     elif isinstance(schema, list):
-        return [_clean_schema_for_gemini(item) for item in schema]
+        return [item if not isinstance(item, (dict, list)) else _clean_schema_for_gemini(item) for item in schema]
     else:
         return schema
 
@@ -45,6 +44,12 @@ class MCPClient:
         self.model_name = "gemini-2.5-flash"
         self.gemini_model = genai.GenerativeModel(self.model_name)
         self.available_prompts = []
+        # Gemini declarations for the server's tools and prompts, built once per session
+        self.gemini_tools: List[FunctionDeclaration] = []
+        self.gemini_prompts: List[FunctionDeclaration] = []
+        # Set when the server notifies that its tool/prompt list changed
+        self.tools_stale = False
+        self.prompts_stale = False
 
     async def connect_to_server(self, server_script_path: str):
         is_python = server_script_path.endswith('.py')
@@ -61,26 +66,51 @@ class MCPClient:
 
         stdio_transport = await self.exit_stack.enter_async_context(stdio_client(server_params))
         self.stdio, self.write = stdio_transport
-        self.session = await self.exit_stack.enter_async_context(ClientSession(self.stdio, self.write))
+        self.session = await self.exit_stack.enter_async_context(ClientSession(self.stdio, self.write, message_handler=self._handle_server_message))
 
         await self.session.initialize()
 
-        if self.session:
-            tools_response = await self.session.list_tools()
-            prompts_response = await self.session.list_prompts()
-            
-            tools = tools_response.tools
-            self.available_prompts = prompts_response.prompts
-            
-            print("\nConnected to server with tools:", [tool.name for tool in tools])
-            print("Available prompts:", [prompt.name for prompt in self.available_prompts])
+        tools_response, prompts_response = await asyncio.gather(
+            self.session.list_tools(),
+            self.session.list_prompts(),
+        )
+
+        tools = tools_response.tools
+        self.available_prompts = prompts_response.prompts
+        self.gemini_tools = self._tool_declarations(tools)
+        self.gemini_prompts = self._prompt_declarations(self.available_prompts)
+
+        print("\nConnected to server with tools:", [tool.name for tool in tools])
+        print("Available prompts:", [prompt.name for prompt in self.available_prompts])
+
+    async def _handle_server_message(self, message) -> None:
+        """Mark the cached declarations stale when the server reports list changes."""
+        if isinstance(message, types.ServerNotification):
+            if isinstance(message.root, types.ToolListChangedNotification):
+                self.tools_stale = True
+            elif isinstance(message.root, types.PromptListChangedNotification):
+                self.prompts_stale = True
 
     async def get_mcp_tools(self) -> List[FunctionDeclaration]:
         if not self.session:
             return []
+        self.tools_stale = False
         tools_result = await self.session.list_tools()
+        self.gemini_tools = self._tool_declarations(tools_result.tools)
+        return self.gemini_tools
+
+    async def get_mcp_prompts(self) -> List[FunctionDeclaration]:
+        if not self.session:
+            return []
+        self.prompts_stale = False
+        prompts_result = await self.session.list_prompts()
+        self.available_prompts = prompts_result.prompts
+        self.gemini_prompts = self._prompt_declarations(self.available_prompts)
+        return self.gemini_prompts
+
+    def _tool_declarations(self, tools) -> List[FunctionDeclaration]:
         gemini_tools = []
-        for tool in tools_result.tools:
+        for tool in tools:
             cleaned_parameters = _clean_schema_for_gemini(tool.inputSchema)
             gemini_tools.append(
                 FunctionDeclaration(
@@ -91,12 +121,9 @@ class MCPClient:
             )
         return gemini_tools
 
-    async def get_mcp_prompts(self) -> List[FunctionDeclaration]:
-        if not self.session:
-            return []
-        prompts_result = await self.session.list_prompts()
+    def _prompt_declarations(self, prompts) -> List[FunctionDeclaration]:
         gemini_prompts = []
-        for prompt in prompts_result.prompts:
+        for prompt in prompts:
             parameters_schema = {
                 "type": "object",
                 "properties": self._convert_prompt_arguments(prompt.arguments) if hasattr(prompt, 'arguments') else {},
@@ -135,9 +162,18 @@ class MCPClient:
         return required
 
     async def get_mcp_tools_and_prompts(self) -> List[FunctionDeclaration]:
-        tools = await self.get_mcp_tools()
-        prompts = await self.get_mcp_prompts()
-        return tools + prompts
+        """
+        Return the cached tool and prompt declarations, refetching only the
+        lists the server has reported as changed since they were last loaded.
+        """
+        refreshes = []
+        if self.tools_stale:
+            refreshes.append(self.get_mcp_tools())
+        if self.prompts_stale:
+            refreshes.append(self.get_mcp_prompts())
+        if refreshes:
+            await asyncio.gather(*refreshes)
+        return self.gemini_tools + self.gemini_prompts
 
     async def process_query(self, query: str, history: List[Dict]) -> str:
         """
@@ -178,30 +214,27 @@ class MCPClient:
             return "No response from Gemini model."
         
         assistant_content_parts = response.candidates[0].content.parts
-        tool_calls_detected = False
+        function_calls = [part.function_call for part in assistant_content_parts if part.function_call]
+        tool_calls_detected = bool(function_calls)
+        for function_call in function_calls:
+            print(f"Gemini requested tool call: {function_call.name} with args: {function_call.args}")
+
+        # Independent tool calls run concurrently; gather keeps Gemini's call order
+        results = await asyncio.gather(*(
+            self.session.call_tool(function_call.name, arguments=dict(function_call.args))
+            for function_call in function_calls
+        ))
+
         tool_outputs = []
-        for part in assistant_content_parts:
-            if part.function_call:
-                tool_calls_detected = True
-                function_call = part.function_call
-                
-                print(f"Gemini requested tool call: {function_call.name} with args: {function_call.args}")
-
-                tool_args = {k: v for k, v in function_call.args.items()}
-
-                result = await self.session.call_tool(
-                    function_call.name,
-                    arguments=tool_args,
-                )
-                
-                tool_output_content = result.content[0].text if result.content else "Tool executed successfully but returned no text content."
-                tool_outputs.append({
-                    "function_response": {
-                        "name": function_call.name,
-                        "response": {"content": tool_output_content}
-                    }
-                })
-        
+        for function_call, result in zip(function_calls, results):
+            tool_output_content = result.content[0].text if result.content else "Tool executed successfully but returned no text content."
+            tool_outputs.append({
+                "function_response": {
+                    "name": function_call.name,
+                    "response": {"content": tool_output_content}
+                }
+            })
+
         if tool_calls_detected:
             messages.append({"role": "model", "parts": assistant_content_parts})
             messages.append({"role": "user", "parts": tool_outputs})
@@ -230,7 +263,7 @@ class MCPClient:
 
         while True:
             try:
-                query = input("\nQuery: ").strip()
+                query = (await asyncio.to_thread(input, "\nQuery: ")).strip()
                 if query.lower() == 'quit':
                     break
                 response = await self.process_query(query, history=[]) 
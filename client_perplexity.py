@@ -1,13 +1,17 @@
 import asyncio
+import hashlib
 import json
 import os
+import re
 import sys
-from typing import Optional, Union, List, Dict, Any
+from typing import Optional, Union, List, Dict, Any, AsyncIterator, Tuple
 from contextlib import AsyncExitStack
 
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
+import httpx
 import openai
+from cachetools import TTLCache
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -17,18 +21,66 @@ PERPLEXITY_API_KEY = os.environ.get("PERPLEXITY_API_KEY")
 if not PERPLEXITY_API_KEY:
     raise ValueError("Please set your PERPLEXITY_API_KEY in the .env file")
 
-# Initialize Perplexity client
-perplexity_client = openai.OpenAI(
-    api_key=PERPLEXITY_API_KEY,
-    base_url="https://api.perplexity.ai"
-)
+def create_perplexity_client() -> openai.AsyncOpenAI:
+    """
+    Create a Perplexity client. The async client keeps the event loop free while
+    a completion is in flight, and its pooled HTTP client reuses TLS connections.
+    """
+    return openai.AsyncOpenAI(
+        api_key=PERPLEXITY_API_KEY,
+        base_url="https://api.perplexity.ai",
+        http_client=httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            timeout=30,
+        ),
+    )
+
+# Location phrases, tried in order: "in [location]", "around [location]", ...
+LOCATION_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'in\s+([A-Za-z\s,]+?)(?:\?|$|\.)',
+    r'around\s+([A-Za-z\s,]+?)(?:\?|$|\.)',
+    r'near\s+([A-Za-z\s,]+?)(?:\?|$|\.)',
+    r'for\s+([A-Za-z\s,]+?)(?:\?|$|\.)',
+))
+LOCATION_FILLER_PATTERN = re.compile(r'\b(restaurants?|food|dining|places?)\b', re.IGNORECASE)
+# Substrings that suggest a query (or tool) is about restaurants
+TOOL_KEYWORD_PATTERN = re.compile(r'restaurant|review|location|yelp|food|dining', re.IGNORECASE)
+
+# Once more than MAX_VERBATIM_HISTORY history messages are unsummarized, older ones are
+# folded into a running summary and only the last KEEP_VERBATIM_HISTORY are sent as-is
+MAX_VERBATIM_HISTORY = 10
+KEEP_VERBATIM_HISTORY = 6
 
 class MCPPerplexityClient:
     def __init__(self):
         self.session: Optional[ClientSession] = None
         self.exit_stack = AsyncExitStack()
         self.model_name = "llama-3.1-sonar-large-128k-online"  # Perplexity's web search model
+        # Each client owns its Perplexity connection pool, so cleanup can close it
+        # without affecting other instances
+        self.perplexity_client = create_perplexity_client()
         self.available_prompts = []
+        # Tool and prompt descriptions for the connected server; the catalog is
+        # static for a session, so it is only fetched again after reconnecting
+        self.tools_cache: Optional[List[Dict[str, Any]]] = None
+        self.prompts_cache: Optional[List[Dict[str, Any]]] = None
+        # Running summary of the first summarized_turns history messages, and a
+        # fingerprint of those messages to tell when the history is a different one
+        self.history_summary = ""
+        self.summarized_turns = 0
+        self.summarized_fingerprint = ""
+        # Answers to standalone, tool-free queries keyed by normalized query text
+        self.response_cache = TTLCache(maxsize=1024, ttl=600)
+
+    @staticmethod
+    def _normalize_query(query: str) -> str:
+        """Normalize a query so trivially different phrasings share a cache entry."""
+        return " ".join(query.lower().strip(" ?!.").split())
+
+    @staticmethod
+    def _history_fingerprint(turns: List[Dict]) -> str:
+        """Hash a run of history messages so a summarized prefix can be recognized later."""
+        return hashlib.sha256(json.dumps(turns, sort_keys=True, default=str).encode()).hexdigest()
 
     async def connect_to_server(self, server_script_path: str):
         is_python = server_script_path.endswith('.py')
@@ -55,6 +107,8 @@ class MCPPerplexityClient:
             
             tools = tools_response.tools
             self.available_prompts = prompts_response.prompts
+            self.tools_cache = [{"name": tool.name, "description": tool.description, "parameters": tool.inputSchema} for tool in tools]
+            self.prompts_cache = [{"name": prompt.name, "description": prompt.description} for prompt in self.available_prompts]
             
             print("\nConnected to server with tools:", [tool.name for tool in tools])
             print("Available prompts:", [prompt.name for prompt in self.available_prompts])
@@ -62,32 +116,35 @@ class MCPPerplexityClient:
     async def get_mcp_tools(self) -> List[Dict[str, Any]]:
         if not self.session:
             return []
-        tools_result = await self.session.list_tools()
-        return [{"name": tool.name, "description": tool.description, "parameters": tool.inputSchema} for tool in tools_result.tools]
+        if self.tools_cache is None:
+            tools_result = await self.session.list_tools()
+            self.tools_cache = [{"name": tool.name, "description": tool.description, "parameters": tool.inputSchema} for tool in tools_result.tools]
+        return self.tools_cache
 
     async def get_mcp_prompts(self) -> List[Dict[str, Any]]:
         if not self.session:
             return []
-        prompts_result = await self.session.list_prompts()
-        return [{"name": prompt.name, "description": prompt.description} for prompt in prompts_result.prompts]
+        if self.prompts_cache is None:
+            prompts_result = await self.session.list_prompts()
+            self.prompts_cache = [{"name": prompt.name, "description": prompt.description} for prompt in prompts_result.prompts]
+        return self.prompts_cache
 
-    async def process_query(self, query: str, history: List[Dict]) -> str:
+    async def _prepare_request(self, query: str, history: List[Dict]) -> Tuple[List[Dict[str, str]], Optional[str]]:
         """
-        Process a query using Perplexity with conversation history and available MCP tools.
-        
-        Args:
-            query: The user's new message.
-            history: The list of previous messages and responses.
+        Build the Perplexity messages for a query, running any MCP tools it needs.
         
         Returns:
-            The response from Perplexity.
+            The messages and the response cache key, or None when the answer
+            depends on history or tool results and must not be reused.
         """
         available_tools = await self.get_mcp_tools()
-        available_prompts = await self.get_mcp_prompts()
         
-        # Build conversation history
+        # Build conversation history, with older turns replaced by their summary
         messages = []
-        for turn in history:
+        recent_history = await self._compact_history(history)
+        if self.summarized_turns:
+            messages.append({"role": "system", "content": f"Summary of the earlier conversation: {self.history_summary}"})
+        for turn in recent_history:
             role = turn.get('role')
             content = turn.get('content')
             if role and content:
@@ -111,33 +168,140 @@ class MCPPerplexityClient:
             enhanced_query = f"{query}\n\nTool Results:\n{tool_results}"
             messages.append({"role": "user", "content": enhanced_query})
         
+        # Answers that depend on conversation history or tool results are not reused.
+        # Tools only return data for queries that mention restaurants, so whether the
+        # answer can be reused is decided from the query alone.
+        cache_key = None
+        if not history and not TOOL_KEYWORD_PATTERN.search(query):
+            cache_key = self._normalize_query(query)
+        return messages, cache_key
+
+    async def _compact_history(self, history: List[Dict]) -> List[Dict]:
+        """
+        Return the history messages to send verbatim, folding older ones into
+        self.history_summary so the prompt stops growing with every turn.
+        """
+        if self.summarized_turns and (
+            len(history) < self.summarized_turns
+            or self._history_fingerprint(history[:self.summarized_turns]) != self.summarized_fingerprint
+        ):
+            # The summarized messages are gone or changed, so this is another conversation
+            self.history_summary = ""
+            self.summarized_turns = 0
+            self.summarized_fingerprint = ""
+        if len(history) - self.summarized_turns > MAX_VERBATIM_HISTORY:
+            cut = len(history) - KEEP_VERBATIM_HISTORY
+            # Keep the verbatim part starting on a user turn so roles still alternate
+            while cut < len(history) and history[cut].get('role') != 'user':
+                cut += 1
+            summary = await self._summarize_history(history[self.summarized_turns:cut])
+            if summary:
+                self.history_summary = summary
+                self.summarized_turns = cut
+                self.summarized_fingerprint = self._history_fingerprint(history[:cut])
+        if not self.summarized_turns:
+            return history
+        return history[self.summarized_turns:]
+
+    async def _summarize_history(self, turns: List[Dict]) -> Optional[str]:
+        """Fold turns into the running summary; returns None if Perplexity fails."""
+        transcript = "\n".join(f"{turn.get('role')}: {turn.get('content')}" for turn in turns if turn.get('content'))
+        prompt = (
+            "Summarize this conversation in a short paragraph, keeping any locations, "
+            "restaurants and preferences mentioned.\n\n"
+            f"Earlier summary: {self.history_summary or 'none'}\n\n{transcript}"
+        )
+        try:
+            response = await self.perplexity_client.chat.completions.create(
+                model=self.model_name,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=300,
+                temperature=0.2
+            )
+            return response.choices[0].message.content
+        except Exception as e:
+            print(f"Warning: Could not summarize conversation history: {str(e)}")
+            return None
+
+    async def process_query(self, query: str, history: List[Dict]) -> str:
+        """
+        Process a query using Perplexity with conversation history and available MCP tools.
+        
+        Args:
+            query: The user's new message.
+            history: The list of previous messages and responses.
+        
+        Returns:
+            The response from Perplexity.
+        """
+        messages, cache_key = await self._prepare_request(query, history)
+        if cache_key is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         # Get response from Perplexity
         try:
-            response = perplexity_client.chat.completions.create(
+            response = await self.perplexity_client.chat.completions.create(
                 model=self.model_name,
                 messages=messages,
                 max_tokens=1000,
                 temperature=0.7
             )
             
-            return response.choices[0].message.content
+            content = response.choices[0].message.content
+            if cache_key is not None:
+                self.response_cache[cache_key] = content
+            return content
             
         except Exception as e:
             return f"Error getting response from Perplexity: {str(e)}"
 
+    async def process_query_stream(self, query: str, history: List[Dict]) -> AsyncIterator[str]:
+        """
+        Like process_query, but yields the response in pieces as Perplexity generates it.
+        """
+        messages, cache_key = await self._prepare_request(query, history)
+        if cache_key is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+
+        parts = []
+        try:
+            stream = await self.perplexity_client.chat.completions.create(
+                model=self.model_name,
+                messages=messages,
+                max_tokens=1000,
+                temperature=0.7,
+                stream=True
+            )
+            
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                text = chunk.choices[0].delta.content
+                if text:
+                    parts.append(text)
+                    yield text
+            
+        except Exception as e:
+            yield f"Error getting response from Perplexity: {str(e)}"
+            return
+
+        if cache_key is not None:
+            self.response_cache[cache_key] = "".join(parts)
+
     async def _check_for_tool_calls(self, query: str, available_tools: List[Dict[str, Any]]) -> bool:
         """Check if the query requires MCP tool calls."""
-        tool_keywords = ["restaurant", "review", "location", "yelp", "food", "dining"]
-        query_lower = query.lower()
-        
         # Check if query mentions restaurants or reviews
-        if any(keyword in query_lower for keyword in tool_keywords):
+        if TOOL_KEYWORD_PATTERN.search(query):
             return True
         
         # Check if any available tools are relevant
         for tool in available_tools:
-            if any(keyword in tool["name"].lower() or keyword in tool["description"].lower() 
-                   for keyword in tool_keywords):
+            if TOOL_KEYWORD_PATTERN.search(tool["name"]) or TOOL_KEYWORD_PATTERN.search(tool["description"] or ""):
                 return True
         
         return False
@@ -185,22 +349,12 @@ class MCPPerplexityClient:
     def _extract_location_from_query(self, query: str) -> Optional[str]:
         """Extract location from user query."""
         # Simple location extraction - look for common patterns
-        import re
-        
-        # Look for "in [location]" or "around [location]" patterns
-        patterns = [
-            r'in\s+([A-Za-z\s,]+?)(?:\?|$|\.)',
-            r'around\s+([A-Za-z\s,]+?)(?:\?|$|\.)',
-            r'near\s+([A-Za-z\s,]+?)(?:\?|$|\.)',
-            r'for\s+([A-Za-z\s,]+?)(?:\?|$|\.)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, query, re.IGNORECASE)
+        for pattern in LOCATION_PATTERNS:
+            match = pattern.search(query)
             if match:
                 location = match.group(1).strip()
                 # Clean up common words
-                location = re.sub(r'\b(restaurants?|food|dining|places?)\b', '', location, flags=re.IGNORECASE).strip()
+                location = LOCATION_FILLER_PATTERN.sub('', location).strip()
                 if location:
                     return location
         
@@ -213,16 +367,26 @@ class MCPPerplexityClient:
 
         while True:
             try:
-                query = input("\nQuery: ").strip()
+                query = (await asyncio.to_thread(input, "\nQuery: ")).strip()
                 if query.lower() == 'quit':
                     break
-                response = await self.process_query(query, history=[]) 
-                print("\n" + response)
+                print()
+                async for text in self.process_query_stream(query, history=[]):
+                    sys.stdout.write(text)
+                    sys.stdout.flush()
+                print()
             except Exception as e:
                 print(f"\nError: {str(e)}")
 
     async def cleanup(self):
         await self.exit_stack.aclose()
+        await self.perplexity_client.close()
+
+    async def __aenter__(self) -> "MCPPerplexityClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.cleanup()
 
 
 async def main():
@@ -230,12 +394,9 @@ async def main():
         print("Usage: python client_perplexity.py <path_to_server_script>")
         sys.exit(1)
 
-    client = MCPPerplexityClient()
-    try:
+    async with MCPPerplexityClient() as client:
         await client.connect_to_server(sys.argv[1])
         await client.chat_loop()
-    finally:
-        await client.cleanup()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -1,15 +1,18 @@
 import os
-import json
+import hashlib
+import re
+import orjson
 from datetime import datetime
 from mcp.server.fastmcp import FastMCP
 from mcp.server.fastmcp.prompts import base
 
 from typing import Any
 import httpx
-import requests
-from typing import Optional
+from typing import Optional, Tuple
 import asyncio
+import threading
 import google.generativeai as genai
+from cachetools import TTLCache
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -21,8 +24,130 @@ genai.configure(api_key=os.environ.get("GOOGLE_API_KEY"))
 # Create an MCP server
 mcp = FastMCP("Restaurant Roulette")
 
+# Gemini suggestions keyed by normalized location. Suggestions for a city barely
+# change within an hour, so repeat lookups skip the model call.
+location_suggestions_cache = TTLCache(maxsize=512, ttl=3600)
+location_suggestions_lock = threading.Lock()
+
+# Yelp search results keyed by (normalized location, limit, radius)
+yelp_search_cache = TTLCache(maxsize=512, ttl=1800)
+yelp_search_lock = threading.Lock()
+
+# Gemini mood rankings keyed by a SHA-256 of the full prompt. The prompt embeds the
+# (cached) Yelp results, so a repeat location and mood maps to the same key.
+gemini_response_cache = TTLCache(maxsize=1024, ttl=3600)
+gemini_response_lock = threading.Lock()
+
+# get_restaurant_reviews entries keyed by (business id, normalized location);
+# review snippets change slowly, so they are kept for a day
+review_entry_cache = TTLCache(maxsize=4096, ttl=86400)
+review_entry_lock = threading.Lock()
+
+# Shared async HTTP client for Yelp and SERPAPI; keeps connections alive across tool calls.
+# It lives as long as the process. It is not closed from the server lifespan, which
+# runs once per client session under SSE/streamable HTTP and would close it for everyone.
+# The transport retries failed connections; http_get retries 429/5xx responses.
+async_http = httpx.AsyncClient(
+    transport=httpx.AsyncHTTPTransport(
+        retries=3,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+    ),
+    timeout=httpx.Timeout(30.0, connect=10.0),
+)
+
+# Transient Yelp/SERPAPI statuses that are retried with exponential backoff
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+HTTP_RETRIES = 3
+RETRY_BACKOFF_SECONDS = 0.3
+
+# Maximum SERPAPI requests in flight for a single tool call
+SERPAPI_CONCURRENCY = 10
+
+# Leading ```/```json and trailing ``` fences around a Gemini JSON reply
+CODE_FENCE_PATTERN = re.compile(r'^\s*```(?:json)?\s*|\s*```\s*$', re.IGNORECASE)
+# A rating such as "4.5 stars" or "4 ⭐" inside a review snippet
+SNIPPET_RATING_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(?:⭐|stars?)', re.IGNORECASE)
+
+# Yelp category aliases and price levels that suit common mood words. Used to send
+# Gemini only the most plausible candidates instead of every business Yelp returns.
+# Aliases are matched exactly, so e.g. "bars" doesn't pick up "bbq" or "salad".
+UPSCALE_CATEGORY_ALIASES = frozenset(("french", "steak", "sushi", "wine_bars", "seafood", "newamerican"))
+HIGH_END_PRICE_LEVELS = frozenset(("$$$", "$$$$"))
+MOOD_CATEGORY_ALIASES = {
+    "spicy": frozenset(("thai", "indpak", "szechuan", "mexican", "korean", "cajun", "hotpot", "ethiopian", "caribbean")),
+    "romantic": frozenset(("french", "italian", "wine_bars", "tapas", "tapasmallplates", "steak", "mediterranean")),
+    "cozy": frozenset(("cafes", "coffee", "bakeries", "ramen", "soup", "comfortfood", "breakfast_brunch")),
+    "casual": frozenset(("burgers", "pizza", "sandwiches", "tacos", "diners", "bbq", "chicken_wings", "chickenshop")),
+    "fun": frozenset(("bars", "pubs", "tacos", "karaoke", "pizza", "korean", "foodtrucks")),
+    "upscale": UPSCALE_CATEGORY_ALIASES,
+    "elegant": UPSCALE_CATEGORY_ALIASES,
+    "adventurous": frozenset(("ethiopian", "peruvian", "vietnamese", "hotpot", "asianfusion", "filipino", "afghani", "georgian")),
+    "unique": frozenset(("asianfusion", "ethiopian", "peruvian", "popuprestaurants", "filipino", "afghani", "georgian")),
+}
+MOOD_PRICE_LEVELS = {
+    "romantic": HIGH_END_PRICE_LEVELS,
+    "upscale": HIGH_END_PRICE_LEVELS,
+    "elegant": HIGH_END_PRICE_LEVELS,
+    "casual": frozenset(("$", "$$")),
+    "cheap": frozenset(("$",)),
+}
+# Words in a mood description
+MOOD_WORD_PATTERN = re.compile(r"[a-z]+")
+MAX_MOOD_CANDIDATES = 20
+
+def to_json(obj: Any, indent: bool = False) -> str:
+    """Serialize obj to a JSON string with orjson."""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+
+async def http_get(url: str, **kwargs) -> httpx.Response:
+    """
+    GET url with the shared client, retrying transient 429/5xx responses with backoff.
+    The last response is returned even if it is still an error, for the caller's status checks.
+    """
+    for attempt in range(HTTP_RETRIES):
+        response = await async_http.get(url, **kwargs)
+        if response.status_code not in RETRY_STATUSES:
+            return response
+        await asyncio.sleep(RETRY_BACKOFF_SECONDS * 2 ** attempt)
+    return await async_http.get(url, **kwargs)
+
+def normalize_location(location: str) -> str:
+    """Normalize a location for use as a cache key."""
+    return " ".join(location.lower().split())
+
+async def _yelp_search(location: str, api_key: str, limit: int, radius: int) -> Tuple[Optional[list], Optional[str]]:
+    """
+    Search Yelp for top-rated restaurants around location, reusing a recent identical search.
+    Returns (businesses, error); error is set when the Yelp request fails.
+    """
+    cache_key = (normalize_location(location), limit, radius)
+    with yelp_search_lock:
+        businesses = yelp_search_cache.get(cache_key)
+    if businesses is not None:
+        return businesses, None
+
+    search_response = await http_get(
+        "https://api.yelp.com/v3/businesses/search",
+        headers={"Authorization": f"Bearer {api_key}"},
+        params={
+            "term": "restaurants",
+            "location": location,
+            "limit": limit,
+            "sort_by": "rating",
+            "radius": radius,
+        },
+    )
+    if search_response.status_code != 200:
+        return None, f"Failed to search restaurants: {search_response.status_code} - {search_response.text}"
+
+    businesses = orjson.loads(search_response.content).get("businesses", [])
+    if businesses:
+        with yelp_search_lock:
+            yelp_search_cache[cache_key] = businesses
+    return businesses, None
+
 @mcp.tool()
-def get_restaurants_by_location(location: str) -> str:
+async def get_restaurants_by_location(location: str) -> str:
     """
     Get 10 restaurant suggestions for a given location using AI.
     
@@ -32,6 +157,12 @@ def get_restaurants_by_location(location: str) -> str:
     Returns:
         A JSON string containing 10 restaurant suggestions with details like name, cuisine type, price range, and brief description
     """
+    cache_key = normalize_location(location)
+    with location_suggestions_lock:
+        cached = location_suggestions_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     try:
         # Initialize Gemini model
         model = genai.GenerativeModel('gemini-2.5-flash')
@@ -64,19 +195,158 @@ def get_restaurants_by_location(location: str) -> str:
         Return only the JSON array, nothing else.
         """
         
-        # Generate response from Gemini
-        response = model.generate_content(prompt)
+        # Generate response from Gemini without blocking the server's event loop
+        response = await model.generate_content_async(prompt)
         
-        # Return the generated content
+        # Cache and return the generated content; errors below are not cached
+        with location_suggestions_lock:
+            location_suggestions_cache[cache_key] = response.text
         return response.text
         
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "error": f"Failed to generate restaurant suggestions: {str(e)}"
         })
 
+async def _fetch_mood_reviews(business: dict, location: str, semaphore: asyncio.Semaphore) -> list:
+    """Collect up to 3 SERPAPI review snippets for a restaurant picked by get_restaurants_by_mood."""
+    reviews = []
+    try:
+        serpapi_key = os.environ.get('SERPAPI_KEY')
+        if serpapi_key:
+            # Search for reviews using SERPAPI
+            serpapi_params = {
+                "engine": "google",
+                "q": f"{business['name']} {location} reviews",
+                "api_key": serpapi_key,
+                "num": 5,  # Only the first 5 results are checked
+                "gl": "us",  # Country
+                "hl": "en"  # Language
+            }
+            
+            async with semaphore:
+                serpapi_response = await http_get("https://serpapi.com/search.json", params=serpapi_params)
+            
+            if serpapi_response.status_code == 200:
+                serpapi_data = orjson.loads(serpapi_response.content)
+                
+                # Extract review snippets from search results
+                organic_results = serpapi_data.get("organic_results", [])
+                review_snippets = []
+                
+                for result in organic_results[:5]:  # Check first 5 results
+                    snippet = result.get("snippet", "")
+                    title = result.get("title", "")
+                    
+                    # Look for review-like content
+                    if snippet and len(snippet) > 30:
+                        # Try to extract rating from snippet
+                        rating = None
+                        if "⭐" in snippet or "stars" in snippet.lower():
+                            # Extract rating if present
+                            rating_match = SNIPPET_RATING_PATTERN.search(snippet)
+                            if rating_match:
+                                rating = float(rating_match.group(1))
+                        
+                        review_snippets.append({
+                            "source": result.get("source", "Unknown"),
+                            "title": title,
+                            "text": snippet,
+                            "rating": rating,
+                            "url": result.get("link", "")
+                        })
+                
+                # Take the first 3 review snippets
+                for i, review_snippet in enumerate(review_snippets[:3]):
+                    reviews.append({
+                        "user_name": f"Reviewer {i+1}",
+                        "rating": review_snippet.get("rating", "N/A"),
+                        "text": review_snippet["text"],
+                        "source": review_snippet["source"],
+                        "url": review_snippet["url"],
+                        "time_created": "Recent"
+                    })
+            
+            # If SERPAPI doesn't return enough reviews, try a more specific search
+            if len(reviews) < 3:
+                specific_params = {
+                    "engine": "google",
+                    "q": f'"{business["name"]}" "{location}" "review" OR "reviews"',
+                    "api_key": serpapi_key,
+                    "num": 10
+                }
+                
+                async with semaphore:
+                    specific_response = await http_get("https://serpapi.com/search.json", params=specific_params)
+                
+                if specific_response.status_code == 200:
+                    specific_data = orjson.loads(specific_response.content)
+                    specific_results = specific_data.get("organic_results", [])
+                    
+                    for result in specific_results:
+                        if len(reviews) >= 3:
+                            break
+                        
+                        snippet = result.get("snippet", "")
+                        if snippet and len(snippet) > 30 and snippet not in [r["text"] for r in reviews]:
+                            reviews.append({
+                                "user_name": f"Reviewer {len(reviews)+1}",
+                                "rating": "N/A",
+                                "text": snippet,
+                                "source": result.get("source", "Unknown"),
+                                "url": result.get("link", ""),
+                                "time_created": "Recent"
+                            })
+        
+        # If we still don't have enough reviews, add a fallback message
+        if len(reviews) < 3:
+            reviews.append({
+                "user_name": "System",
+                "rating": "N/A",
+                "text": f"Restaurant information available. Overall rating: {business['rating']} stars with {business['review_count']} reviews on Yelp.",
+                "source": "Yelp",
+                "url": business.get("url", ""),
+                "time_created": "N/A"
+            })
+            
+    except Exception as e:
+        print(f"Error fetching SERPAPI reviews for {business['name']}: {str(e)}")
+        # Fallback to basic restaurant info
+        reviews.append({
+            "user_name": "System",
+            "rating": business['rating'],
+            "text": f"Restaurant information available. Overall rating: {business['rating']} stars with {business['review_count']} reviews on Yelp.",
+            "source": "Yelp",
+            "url": business.get("url", ""),
+            "time_created": "N/A"
+        })
+    
+    return reviews
+
+def _prefilter_for_mood(businesses: list, mood: str) -> list:
+    """
+    Keep the MAX_MOOD_CANDIDATES businesses whose category aliases and price best fit the mood
+    words, ties keeping Yelp's rating order. Returns businesses unchanged when the mood
+    has no known words or nothing matches, so the heuristic never hides every candidate.
+    """
+    words = MOOD_WORD_PATTERN.findall(mood.lower())
+    aliases = frozenset().union(*(MOOD_CATEGORY_ALIASES.get(word, ()) for word in words))
+    price_levels = frozenset().union(*(MOOD_PRICE_LEVELS.get(word, ()) for word in words))
+    if len(businesses) <= MAX_MOOD_CANDIDATES or not (aliases or price_levels):
+        return businesses
+
+    def score(business: dict) -> int:
+        category_hits = sum(1 for cat in business["categories"] if cat.get("alias") in aliases)
+        return category_hits + (business.get("price") in price_levels)
+
+    scores = [score(business) for business in businesses]
+    if not any(scores):
+        return businesses
+    ranked = sorted(range(len(businesses)), key=lambda i: -scores[i])
+    return [businesses[i] for i in ranked[:MAX_MOOD_CANDIDATES]]
+
 @mcp.tool()
-def get_restaurants_by_mood(location: str, mood: str) -> str:
+async def get_restaurants_by_mood(location: str, mood: str) -> str:
     """
     Get 10 restaurant suggestions for a given location based on mood criteria using real Yelp data and AI filtering.
     Returns structured JSON data perfect for frontend UI consumption.
@@ -94,68 +364,54 @@ def get_restaurants_by_mood(location: str, mood: str) -> str:
         serpapi_key = os.environ.get('SERPAPI_KEY')
         
         if not yelp_api_key:
-            return json.dumps({
+            return to_json({
                 "error": "Yelp API key not found. Please set YELP_API_KEY in your environment variables."
             })
         
         # Step 1: Get real restaurants from Yelp API
-        search_headers = {"Authorization": f"Bearer {yelp_api_key}"}
-        search_params = {
-            "term": "restaurants",
-            "location": location,
-            "limit": 50,  # Get more restaurants to filter from
-            "sort_by": "rating",
-            "radius": 10000  # 10km radius to get more options
-        }
-        
-        search_response = requests.get("https://api.yelp.com/v3/businesses/search", 
-                                     headers=search_headers, params=search_params)
-        
-        if search_response.status_code != 200:
-            return json.dumps({
-                "error": f"Failed to search restaurants: {search_response.status_code} - {search_response.text}"
-            })
-        
-        businesses = search_response.json().get("businesses", [])
+        businesses, error = await _yelp_search(
+            location,
+            yelp_api_key,
+            limit=50,  # Get more restaurants to filter from
+            radius=10000,  # 10km radius to get more options
+        )
+        if error:
+            return to_json({"error": error})
         
         if not businesses:
-            return json.dumps({
+            return to_json({
                 "error": f"No restaurants found for location: {location}"
             })
         
         # Step 2: Use Gemini to filter and match restaurants to mood
         model = genai.GenerativeModel('gemini-2.5-flash')
         
-        # Prepare restaurant data for Gemini
-        restaurant_data = []
-        for business in businesses:
-            restaurant_data.append({
+        # Narrow the Yelp results to the likeliest candidates before building the prompt
+        candidates = _prefilter_for_mood(businesses, mood)
+        
+        # Prepare restaurant data for Gemini. Only fields that say something about the
+        # mood are sent; address, links and photos are filled in from Yelp afterwards.
+        restaurant_data = [
+            {
                 "name": business["name"],
                 "cuisine": [cat["title"] for cat in business["categories"]],
                 "price_range": business.get("price", "N/A"),
                 "rating": business["rating"],
-                "review_count": business["review_count"],
-                "address": " ".join(business["location"]["display_address"]),
-                "neighborhood": business["location"].get("city", ""),
-                "url": business.get("url", ""),
-                "phone": business.get("phone", ""),
-                "image_url": business.get("image_url", ""),
-                "business_id": business["id"]
-            })
+                "review_count": business["review_count"]
+            }
+            for business in candidates
+        ]
         
         # Create prompt for mood-based filtering
         prompt = f"""
         You are a restaurant recommendation expert. I have real restaurant data from Yelp for {location}, and I need you to select and rank the top 10 restaurants that best match the mood: "{mood}".
         
         Here are the real restaurants from Yelp:
-        {json.dumps(restaurant_data, indent=2)}
+        {to_json(restaurant_data)}
         
         Please select exactly 10 restaurants that best match the "{mood}" mood and provide:
         - Restaurant name (use the exact name from the data)
         - Cuisine type (from the categories)
-        - Price range (from the data)
-        - Rating and review count
-        - Address
         - Why it matches the mood (brief explanation)
         
         IMPORTANT: Only use restaurants from the provided data. Do not make up restaurants.
@@ -164,10 +420,6 @@ def get_restaurants_by_mood(location: str, mood: str) -> str:
             {{
                 "name": "Exact Restaurant Name from Data",
                 "cuisine": "Primary Cuisine Type",
-                "price_range": "Price from Data",
-                "rating": "Rating from Data",
-                "review_count": "Review Count from Data",
-                "address": "Address from Data",
                 "mood_match": "Why this restaurant matches the mood"
             }}
         ]
@@ -176,154 +428,57 @@ def get_restaurants_by_mood(location: str, mood: str) -> str:
         Return only the JSON array, nothing else.
         """
         
-        # Generate response from Gemini
-        response = model.generate_content(prompt)
+        # Generate response from Gemini, unless this exact prompt was answered recently
+        prompt_key = hashlib.sha256(prompt.encode()).digest()
+        with gemini_response_lock:
+            gemini_text = gemini_response_cache.get(prompt_key)
+        if gemini_text is None:
+            response = await model.generate_content_async(prompt)
+            gemini_text = response.text
         
         # Parse and format the response
         try:
-            # Extract JSON from response
-            response_text = response.text.strip()
-            if response_text.startswith('```json'):
-                response_text = response_text[7:]
-            if response_text.endswith('```'):
-                response_text = response_text[:-3]
+            # Extract JSON from response: drop any code fence, then fall back to the
+            # outermost [...] if the model wrapped the array in extra text
+            response_text = CODE_FENCE_PATTERN.sub("", gemini_text)
+            try:
+                selected_restaurants = orjson.loads(response_text)
+            except orjson.JSONDecodeError:
+                start, end = response_text.find('['), response_text.rfind(']')
+                if start == -1 or end < start:
+                    raise
+                selected_restaurants = orjson.loads(response_text[start:end + 1])
+            # Only replies that parse are worth reusing
+            with gemini_response_lock:
+                gemini_response_cache[prompt_key] = gemini_text
             
-            selected_restaurants = json.loads(response_text)
+            # Step 3: Match the selections to their Yelp data and fetch reviews for all of them concurrently
+            businesses_by_name = {}
+            for business in businesses:
+                businesses_by_name.setdefault(business["name"], business)
+            matched_restaurants = [
+                (selected_restaurant, businesses_by_name[selected_restaurant["name"]])
+                for selected_restaurant in selected_restaurants
+                if selected_restaurant["name"] in businesses_by_name
+            ]
             
-            # Step 3: Get detailed information and reviews for selected restaurants
-            final_restaurants = []
+            semaphore = asyncio.Semaphore(SERPAPI_CONCURRENCY)
+            all_reviews = await asyncio.gather(*(
+                _fetch_mood_reviews(full_restaurant_data, location, semaphore)
+                for _, full_restaurant_data in matched_restaurants
+            ))
             
-            for selected_restaurant in selected_restaurants:
-                # Find the full restaurant data from Yelp
-                full_restaurant_data = None
-                for business in businesses:
-                    if business["name"] == selected_restaurant["name"]:
-                        full_restaurant_data = business
-                        break
-                
-                if not full_restaurant_data:
-                    continue
-                
-                # Get reviews for this restaurant using SERPAPI
-                reviews = []
-                try:
-                    serpapi_key = os.environ.get('SERPAPI_KEY')
-                    if serpapi_key:
-                        # Search for reviews using SERPAPI
-                        serpapi_params = {
-                            "engine": "google",
-                            "q": f"{selected_restaurant['name']} {location} reviews",
-                            "api_key": serpapi_key,
-                            "num": 10,
-                            "gl": "us",  # Country
-                            "hl": "en"  # Language
-                        }
-                        
-                        serpapi_response = requests.get("https://serpapi.com/search.json", params=serpapi_params)
-                        
-                        if serpapi_response.status_code == 200:
-                            serpapi_data = serpapi_response.json()
-                            
-                            # Extract review snippets from search results
-                            organic_results = serpapi_data.get("organic_results", [])
-                            review_snippets = []
-                            
-                            for result in organic_results[:5]:  # Check first 5 results
-                                snippet = result.get("snippet", "")
-                                title = result.get("title", "")
-                                
-                                # Look for review-like content
-                                if snippet and len(snippet) > 30:
-                                    # Try to extract rating from snippet
-                                    rating = None
-                                    if "⭐" in snippet or "stars" in snippet.lower():
-                                        # Extract rating if present
-                                        import re
-                                        rating_match = re.search(r'(\d+(?:\.\d+)?)\s*(?:⭐|stars?)', snippet, re.IGNORECASE)
-                                        if rating_match:
-                                            rating = float(rating_match.group(1))
-                                    
-                                    review_snippets.append({
-                                        "source": result.get("source", "Unknown"),
-                                        "title": title,
-                                        "text": snippet,
-                                        "rating": rating,
-                                        "url": result.get("link", "")
-                                    })
-                            
-                            # Take the first 3 review snippets
-                            for i, review_snippet in enumerate(review_snippets[:3]):
-                                reviews.append({
-                                    "user_name": f"Reviewer {i+1}",
-                                    "rating": review_snippet.get("rating", "N/A"),
-                                    "text": review_snippet["text"],
-                                    "source": review_snippet["source"],
-                                    "url": review_snippet["url"],
-                                    "time_created": "Recent"
-                                })
-                        
-                        # If SERPAPI doesn't return enough reviews, try a more specific search
-                        if len(reviews) < 3:
-                            specific_params = {
-                                "engine": "google",
-                                "q": f'"{selected_restaurant["name"]}" "{location}" "review" OR "reviews"',
-                                "api_key": serpapi_key,
-                                "num": 10
-                            }
-                            
-                            specific_response = requests.get("https://serpapi.com/search.json", params=specific_params)
-                            
-                            if specific_response.status_code == 200:
-                                specific_data = specific_response.json()
-                                specific_results = specific_data.get("organic_results", [])
-                                
-                                for result in specific_results:
-                                    if len(reviews) >= 3:
-                                        break
-                                    
-                                    snippet = result.get("snippet", "")
-                                    if snippet and len(snippet) > 30 and snippet not in [r["text"] for r in reviews]:
-                                        reviews.append({
-                                            "user_name": f"Reviewer {len(reviews)+1}",
-                                            "rating": "N/A",
-                                            "text": snippet,
-                                            "source": result.get("source", "Unknown"),
-                                            "url": result.get("link", ""),
-                                            "time_created": "Recent"
-                                        })
-                    
-                    # If we still don't have enough reviews, add a fallback message
-                    if len(reviews) < 3:
-                        reviews.append({
-                            "user_name": "System",
-                            "rating": "N/A",
-                            "text": f"Restaurant information available. Overall rating: {selected_restaurant['rating']} stars with {selected_restaurant['review_count']} reviews on Yelp.",
-                            "source": "Yelp",
-                            "url": full_restaurant_data.get("url", ""),
-                            "time_created": "N/A"
-                        })
-                        
-                except Exception as e:
-                    print(f"Error fetching SERPAPI reviews for {selected_restaurant['name']}: {str(e)}")
-                    # Fallback to basic restaurant info
-                    reviews.append({
-                        "user_name": "System",
-                        "rating": selected_restaurant['rating'],
-                        "text": f"Restaurant information available. Overall rating: {selected_restaurant['rating']} stars with {selected_restaurant['review_count']} reviews on Yelp.",
-                        "source": "Yelp",
-                        "url": full_restaurant_data.get("url", ""),
-                        "time_created": "N/A"
-                    })
-                
+            final_restaurants = []
+            for (selected_restaurant, full_restaurant_data), reviews in zip(matched_restaurants, all_reviews):
                 # Create structured restaurant object
                 restaurant_obj = {
                     "id": full_restaurant_data["id"],
                     "name": selected_restaurant["name"],
                     "cuisine": selected_restaurant["cuisine"],
-                    "price_range": selected_restaurant["price_range"],
-                    "rating": float(selected_restaurant["rating"]),
-                    "review_count": int(selected_restaurant["review_count"]),
-                    "address": selected_restaurant["address"],
+                    "price_range": full_restaurant_data.get("price", "N/A"),
+                    "rating": float(full_restaurant_data["rating"]),
+                    "review_count": int(full_restaurant_data["review_count"]),
+                    "address": " ".join(full_restaurant_data["location"]["display_address"]),
                     "phone": full_restaurant_data.get("phone", ""),
                     "url": full_restaurant_data.get("url", ""),
                     "image_url": full_restaurant_data.get("image_url", ""),
@@ -348,23 +503,127 @@ def get_restaurants_by_mood(location: str, mood: str) -> str:
                 "timestamp": datetime.now().isoformat()
             }
             
-            return json.dumps(result, indent=2)
+            return to_json(result, indent=True)
             
-        except json.JSONDecodeError as e:
-            return json.dumps({
+        except orjson.JSONDecodeError as e:
+            return to_json({
                 "success": False,
                 "error": f"Error parsing Gemini response: {str(e)}",
-                "raw_response": response.text
+                "raw_response": gemini_text
             })
         
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": f"Failed to get mood-based restaurant suggestions: {str(e)}"
         })
 
+async def _fetch_business_review(business: dict, location: str, serpapi_key: str, semaphore: asyncio.Semaphore) -> dict:
+    """Search SERPAPI for one restaurant's reviews and build its review entry."""
+    cache_key = (business["id"], normalize_location(location))
+    with review_entry_lock:
+        cached = review_entry_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    business_name = business["name"]
+    business_url = business.get("url", "")
+    
+    # Use SERPAPI to search for reviews
+    serpapi_params = {
+        "engine": "google",
+        "q": f"{business_name} {location} reviews",
+        "api_key": serpapi_key,
+        "num": 3  # Only the top 3 results are used
+    }
+    
+    try:
+        async with semaphore:
+            serpapi_response = await http_get("https://serpapi.com/search.json", params=serpapi_params)
+        
+        if serpapi_response.status_code == 200:
+            serpapi_data = orjson.loads(serpapi_response.content)
+            
+            # Extract review snippets from search results
+            organic_results = serpapi_data.get("organic_results", [])
+            review_snippets = []
+            
+            for result in organic_results[:3]:  # Take top 3 results
+                snippet = result.get("snippet", "")
+                if snippet and len(snippet) > 50:  # Filter out very short snippets
+                    review_snippets.append(snippet)
+            
+            # Create a review entry
+            if review_snippets:
+                # Combine snippets into a review
+                combined_review = " ".join(review_snippets[:2])  # Take first 2 snippets
+                
+                entry = {
+                    "restaurant_name": business_name,
+                    "restaurant_id": business["id"],
+                    "reviewer_name": "Customer Review",
+                    "rating": business["rating"],
+                    "review_text": combined_review[:500],  # Limit length
+                    "date": "Recent",
+                    "restaurant_rating": business["rating"],
+                    "restaurant_price": business.get("price", "N/A"),
+                    "restaurant_categories": [cat["title"] for cat in business["categories"]],
+                    "restaurant_address": " ".join(business["location"]["display_address"]),
+                    "restaurant_city": business["location"]["city"],
+                    "restaurant_url": business_url
+                }
+            else:
+                # If no review snippets found, create a basic entry
+                entry = {
+                    "restaurant_name": business_name,
+                    "restaurant_id": business["id"],
+                    "reviewer_name": "No reviews found",
+                    "rating": business["rating"],
+                    "review_text": f"Restaurant information available. Overall rating: {business['rating']} stars with {business['review_count']} reviews on Yelp.",
+                    "date": "N/A",
+                    "restaurant_rating": business["rating"],
+                    "restaurant_price": business.get("price", "N/A"),
+                    "restaurant_categories": [cat["title"] for cat in business["categories"]],
+                    "restaurant_url": business_url
+                }
+
+            # Only entries built from a successful search are cached
+            with review_entry_lock:
+                review_entry_cache[cache_key] = entry
+            return entry
+        
+        else:
+            # SERPAPI request failed, still include restaurant info
+            return {
+                "restaurant_name": business_name,
+                "restaurant_id": business["id"],
+                "reviewer_name": "SERPAPI Error",
+                "rating": business["rating"],
+                "review_text": f"Could not fetch reviews via SERPAPI. Restaurant has {business['review_count']} reviews on Yelp. Error: {serpapi_response.status_code}",
+                "date": "N/A",
+                "restaurant_rating": business["rating"],
+                "restaurant_price": business.get("price", "N/A"),
+                "restaurant_categories": [cat["title"] for cat in business["categories"]],
+                "restaurant_url": business_url
+            }
+            
+    except Exception as e:
+        # Handle any errors in SERPAPI request
+        return {
+            "restaurant_name": business_name,
+            "restaurant_id": business["id"],
+            "reviewer_name": "Error",
+            "rating": business["rating"],
+            "review_text": f"Error fetching reviews: {str(e)}. Restaurant has {business['review_count']} reviews on Yelp.",
+            "date": "N/A",
+            "restaurant_rating": business["rating"],
+            "restaurant_price": business.get("price", "N/A"),
+            "restaurant_categories": [cat["title"] for cat in business["categories"]],
+            "restaurant_url": business_url
+        }
+
 @mcp.tool()
-def get_restaurant_reviews(location: str) -> str:
+async def get_restaurant_reviews(location: str) -> str:
     """
     Get restaurant reviews for a specific location. Returns a simple list of restaurants with their reviews.
     
@@ -380,157 +639,64 @@ def get_restaurant_reviews(location: str) -> str:
         serpapi_key = os.environ.get('SERPAPI_KEY')
         
         if not yelp_api_key:
-            return json.dumps({
+            return to_json({
                 "error": "Yelp API key not found. Please set YELP_API_KEY in your environment variables."
             })
         
         if not serpapi_key:
-            return json.dumps({
+            return to_json({
                 "error": "SERPAPI key not found. Please set SERPAPI_KEY in your environment variables."
             })
         
         # Step 1: Get restaurants from Yelp API
-        search_headers = {"Authorization": f"Bearer {yelp_api_key}"}
-        search_params = {
-            "term": "restaurants",
-            "location": location,
-            "limit": 10,
-            "sort_by": "rating",
-            "radius": 5000  # 5km radius to get more local results
-        }
-        
-        search_response = requests.get("https://api.yelp.com/v3/businesses/search", 
-                                     headers=search_headers, params=search_params)
-        
-        if search_response.status_code != 200:
-            return json.dumps({
-                "error": f"Failed to search restaurants: {search_response.status_code} - {search_response.text}"
-            })
-        
-        businesses = search_response.json().get("businesses", [])
-        
+        businesses, error = await _yelp_search(
+            location,
+            yelp_api_key,
+            limit=10,
+            radius=5000,  # 5km radius to get more local results
+        )
+        if error:
+            return to_json({"error": error})
+
         if not businesses:
-            return json.dumps({
+            return to_json({
                 "error": f"No restaurants found for location: {location}"
             })
         
         # Step 2: Get reviews for each restaurant using SERPAPI
-        all_reviews = []
-        
-        for business in businesses[:10]:  # Limit to 10 restaurants
-            business_name = business["name"]
-            business_url = business.get("url", "")
-            
-            # Use SERPAPI to search for reviews
-            serpapi_params = {
-                "engine": "google",
-                "q": f"{business_name} {location} reviews",
-                "api_key": serpapi_key,
-                "num": 10
-            }
-            
-            try:
-                serpapi_response = requests.get("https://serpapi.com/search.json", params=serpapi_params)
-                
-                if serpapi_response.status_code == 200:
-                    serpapi_data = serpapi_response.json()
-                    
-                    # Extract review snippets from search results
-                    organic_results = serpapi_data.get("organic_results", [])
-                    review_snippets = []
-                    
-                    for result in organic_results[:3]:  # Take top 3 results
-                        snippet = result.get("snippet", "")
-                        if snippet and len(snippet) > 50:  # Filter out very short snippets
-                            review_snippets.append(snippet)
-                    
-                    # Create a review entry
-                    if review_snippets:
-                        # Combine snippets into a review
-                        combined_review = " ".join(review_snippets[:2])  # Take first 2 snippets
-                        
-                        all_reviews.append({
-                            "restaurant_name": business_name,
-                            "restaurant_id": business["id"],
-                            "reviewer_name": "Customer Review",
-                            "rating": business["rating"],
-                            "review_text": combined_review[:500],  # Limit length
-                            "date": "Recent",
-                            "restaurant_rating": business["rating"],
-                            "restaurant_price": business.get("price", "N/A"),
-                            "restaurant_categories": [cat["title"] for cat in business["categories"]],
-                            "restaurant_address": " ".join(business["location"]["display_address"]),
-                            "restaurant_city": business["location"]["city"],
-                            "restaurant_url": business_url
-                        })
-                    else:
-                        # If no review snippets found, create a basic entry
-                        all_reviews.append({
-                            "restaurant_name": business_name,
-                            "restaurant_id": business["id"],
-                            "reviewer_name": "No reviews found",
-                            "rating": business["rating"],
-                            "review_text": f"Restaurant information available. Overall rating: {business['rating']} stars with {business['review_count']} reviews on Yelp.",
-                            "date": "N/A",
-                            "restaurant_rating": business["rating"],
-                            "restaurant_price": business.get("price", "N/A"),
-                            "restaurant_categories": [cat["title"] for cat in business["categories"]],
-                            "restaurant_url": business_url
-                        })
-                
-                else:
-                    # SERPAPI request failed, still include restaurant info
-                    all_reviews.append({
-                        "restaurant_name": business_name,
-                        "restaurant_id": business["id"],
-                        "reviewer_name": "SERPAPI Error",
-                        "rating": business["rating"],
-                        "review_text": f"Could not fetch reviews via SERPAPI. Restaurant has {business['review_count']} reviews on Yelp. Error: {serpapi_response.status_code}",
-                        "date": "N/A",
-                        "restaurant_rating": business["rating"],
-                        "restaurant_price": business.get("price", "N/A"),
-                        "restaurant_categories": [cat["title"] for cat in business["categories"]],
-                        "restaurant_url": business_url
-                    })
-                    
-            except Exception as e:
-                # Handle any errors in SERPAPI request
-                all_reviews.append({
-                    "restaurant_name": business_name,
-                    "restaurant_id": business["id"],
-                    "reviewer_name": "Error",
-                    "rating": business["rating"],
-                    "review_text": f"Error fetching reviews: {str(e)}. Restaurant has {business['review_count']} reviews on Yelp.",
-                    "date": "N/A",
-                    "restaurant_rating": business["rating"],
-                    "restaurant_price": business.get("price", "N/A"),
-                    "restaurant_categories": [cat["title"] for cat in business["categories"]],
-                    "restaurant_url": business_url
-                })
+        semaphore = asyncio.Semaphore(SERPAPI_CONCURRENCY)
+        all_reviews = list(await asyncio.gather(*(
+            _fetch_business_review(business, location, serpapi_key, semaphore)
+            for business in businesses[:10]  # Limit to 10 restaurants
+        )))
         
         if not all_reviews:
-            return json.dumps({
+            return to_json({
                 "error": f"No restaurants or reviews found for {location}"
             })
         
         # Format the response for better presentation
-        response_text = f"🍽️ RESTAURANT REVIEWS NEAR {location.upper()}\n"
-        response_text += f"Found {len(all_reviews)} restaurants within 5km (includes nearby areas)\n\n"
+        lines = [
+            f"🍽️ RESTAURANT REVIEWS NEAR {location.upper()}",
+            f"Found {len(all_reviews)} restaurants within 5km (includes nearby areas)",
+            "",
+        ]
         
         for i, restaurant in enumerate(all_reviews, 1):
-            response_text += f"{i}. {restaurant['restaurant_name']} ⭐ {restaurant['rating']}\n"
-            response_text += f"   📍 {restaurant.get('restaurant_address', 'Address not available')}\n"
-            response_text += f"   🍴 {', '.join(restaurant['restaurant_categories'])}\n"
-            response_text += f"   💰 {restaurant.get('restaurant_price', 'Price not available')}\n"
-            response_text += f"   📝 Review: {restaurant['review_text']}\n"
-            response_text += f"   🔗 {restaurant.get('restaurant_url', '')}\n\n"
+            lines.append(f"{i}. {restaurant['restaurant_name']} ⭐ {restaurant['rating']}")
+            lines.append(f"   📍 {restaurant.get('restaurant_address', 'Address not available')}")
+            lines.append(f"   🍴 {', '.join(restaurant['restaurant_categories'])}")
+            lines.append(f"   💰 {restaurant.get('restaurant_price', 'Price not available')}")
+            lines.append(f"   📝 Review: {restaurant['review_text']}")
+            lines.append(f"   🔗 {restaurant.get('restaurant_url', '')}")
+            lines.append("")
         
-        response_text += "💡 Note: These restaurants are within 5km of your search location and include nearby areas."
+        lines.append("💡 Note: These restaurants are within 5km of your search location and include nearby areas.")
         
-        return response_text
+        return "\n".join(lines)
         
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "error": f"Failed to fetch restaurant reviews: {str(e)}"
         })
 
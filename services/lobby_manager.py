@@ -9,6 +9,9 @@ from typing import Dict, Optional, Set
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 
+# Error returned by update_lobby_state when someone other than the host calls it
+NOT_HOST_ERROR = "Only the host can update lobby state"
+
 @dataclass
 class Lobby:
     """Represents a multiplayer lobby."""
@@ -94,6 +97,21 @@ class LobbyManager:
             lobby.update_activity()
             return True, lobby, None
     
+    def join_or_attach(self, lobby_id: str, player_id: str) -> tuple[Optional[Lobby], Optional[str]]:
+        """
+        Get a lobby, adding the player to it if they are not already a member.
+        Returns: (lobby, error_message)
+        """
+        with self.lock:
+            lobby = self._get_lobby_unlocked(lobby_id)
+            if not lobby:
+                return None, "Lobby not found"
+            
+            if player_id not in lobby.players:
+                lobby.players.add(player_id)
+                lobby.update_activity()
+            return lobby, None
+    
     def leave_lobby(self, lobby_id: str, player_id: str):
         """Remove a player from a lobby."""
         with self.lock:
@@ -116,7 +134,7 @@ class LobbyManager:
                 return False, "Lobby not found"
             
             if lobby.host_id != host_id:
-                return False, "Only the host can update lobby state"
+                return False, NOT_HOST_ERROR
             
             if restaurants is not None:
                 lobby.restaurants = restaurants
@@ -0,0 +1,185 @@
+"""
+Conversion of Azure AI agent results into the restaurant format the UI expects.
+Kept free of Flask and Azure imports and fully annotated so it can be compiled
+with mypyc (run `mypyc restaurant_converter.py` inside services/). The compiled
+extension is picked up automatically; without it the plain module is used.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Keys the agent may use for restaurant fields, tried in order. Name and address
+# defaults depend on the restaurant's position and the search location.
+RESTAURANT_NAME_KEYS = ("name", "restaurant_name")
+RESTAURANT_ADDRESS_KEYS = ("address", "location")
+# (field, keys, default) for the remaining restaurant fields
+RESTAURANT_FIELDS = (
+    ("cuisine", ("cuisine", "cuisine_type"), "Various"),
+    ("price_range", ("price_range", "price"), "$$"),
+    ("rating", ("rating", "rating_score"), 4.0),
+    ("description", ("description", "summary"), ""),
+    ("phone", ("phone", "phone_number"), "N/A"),
+    ("url", ("url", "website"), "https://google.com"),
+    ("image_url", ("image_url", "image"), "https://via.placeholder.com/300x200?text=Restaurant"),
+)
+
+VALID_PRICE_RANGES = frozenset(("$", "$$", "$$$", "$$$$"))
+
+# Fields shared by every review that doesn't come with its own reviewer or rating
+CUSTOMER_REVIEW = {
+    "user_name": "Customer Review",
+    "rating": 4,
+    "source": "Restaurant Review",
+}
+
+# Keys the agent may use for each review field, first non-empty value wins: (field, keys, default)
+REVIEW_FIELDS = (
+    ("text", ("text", "review", "content", "review_text", "snippet"), ""),
+    ("user_name", ("user_name", "reviewer", "name", "author", "reviewer_name"), "Anonymous"),
+    ("url", ("url", "source_url", "link", "source"), None),
+    ("time_created", ("date", "time_created", "created_at"), None),
+)
+
+def first_present(data: Dict[str, Any], keys: Tuple[str, ...], default: Any = None) -> Any:
+    """Return the value of the first key present in data, or default."""
+    for key in keys:
+        if key in data:
+            return data[key]
+    return default
+
+def first_truthy(data: Dict[str, Any], keys: Tuple[str, ...], default: Any = None) -> Any:
+    """Return the first non-empty value among keys in data, or default."""
+    for key in keys:
+        value = data.get(key)
+        if value:
+            return value
+    return default
+
+def convert_azure_to_ui_format(azure_result: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert Azure AI result (with JSON data) to UI-compatible format."""
+    if not azure_result.get("success"):
+        return {
+            "success": False,
+            "error": azure_result.get("error", "Unknown error")
+        }
+    
+    json_data = azure_result.get("json_data", {})
+    location = azure_result.get("location", "Unknown")
+    mood = azure_result.get("mood", "Unknown")
+    # Fallbacks that are the same for every restaurant in this response
+    today = datetime.now().strftime("%Y-%m-%d")
+    default_mood_match = f"This restaurant matches your '{mood}' mood perfectly."
+    
+    restaurants: List[Dict[str, Any]] = []
+    
+    # Handle different possible JSON structures from the agent
+    # The agent might return a list of restaurants or an object with a restaurants key
+    restaurant_list: Any = []
+    if isinstance(json_data, list):
+        restaurant_list = json_data
+    elif isinstance(json_data, dict):
+        # Try common keys
+        restaurant_list = json_data.get("restaurants", json_data.get("restaurant_list", []))
+        # If it's a single restaurant object, wrap it in a list
+        if not restaurant_list and "name" in json_data:
+            restaurant_list = [json_data]
+    
+    # Process each restaurant from the JSON
+    for i, restaurant_data in enumerate(restaurant_list):
+        if not isinstance(restaurant_data, dict):
+            continue
+        
+        # Extract restaurant information
+        fields = {
+            field: first_present(restaurant_data, keys, default)
+            for field, keys, default in RESTAURANT_FIELDS
+        }
+        name = first_present(restaurant_data, RESTAURANT_NAME_KEYS, f"Restaurant {i+1}")
+        address = first_present(restaurant_data, RESTAURANT_ADDRESS_KEYS, location)
+        cuisine = fields["cuisine"]
+        price_range = fields["price_range"]
+        rating = fields["rating"]
+        description = fields["description"]
+        restaurant_url = restaurant_data.get("url", "https://google.com")
+        mood_match = description or default_mood_match
+        
+        # Extract reviews - handle different possible structures
+        reviews: List[Dict[str, Any]] = []
+        reviews_data = restaurant_data.get("reviews", [])
+        
+        # Try multiple possible keys for reviews
+        if not reviews_data:
+            reviews_data = first_present(restaurant_data, ("review", "review_list"), [])
+        
+        if isinstance(reviews_data, list):
+            for review_item in reviews_data:
+                if isinstance(review_item, dict):
+                    # Try multiple possible keys for each review field
+                    review = {
+                        field: first_truthy(review_item, keys, default)
+                        for field, keys, default in REVIEW_FIELDS
+                    }
+                    review_text = review["text"]
+                    review_rating = first_present(review_item, ("rating", "review_rating"), 4)
+                    
+                    if review_text and len(review_text.strip()) > 0:
+                        reviews.append({
+                            "user_name": review["user_name"],
+                            "rating": float(review_rating) if review_rating else 4,
+                            "text": review_text.strip(),
+                            "source": "Restaurant Review",
+                            "url": review["url"] or restaurant_url,
+                            "time_created": review["time_created"] or today
+                        })
+                elif isinstance(review_item, str) and len(review_item.strip()) > 0:
+                    # If review is just a string
+                    reviews.append({
+                        **CUSTOMER_REVIEW,
+                        "text": review_item.strip(),
+                        "url": restaurant_url,
+                        "time_created": today
+                    })
+        
+        # If no reviews found, add a default one (but log it for debugging)
+        if not reviews:
+            logger.warning("No reviews found for restaurant: %s", name)
+            reviews.append({
+                **CUSTOMER_REVIEW,
+                "text": mood_match,
+                "url": restaurant_url,
+                "time_created": today
+            })
+        
+        # Create restaurant object
+        restaurant = {
+            "id": f"azure_{i}",
+            "name": name,
+            "cuisine": cuisine,
+            "price_range": price_range if isinstance(price_range, str) and price_range in VALID_PRICE_RANGES else "$$",
+            "rating": float(rating) if rating else 4.0,
+            "review_count": len(reviews),
+            "address": address,
+            "phone": fields["phone"],
+            "url": fields["url"],
+            "image_url": fields["image_url"],
+            "coordinates": restaurant_data.get("coordinates", {
+                "latitude": restaurant_data.get("latitude", 40.5),
+                "longitude": restaurant_data.get("longitude", -74.4)
+            }),
+            "categories": restaurant_data.get("categories", [cuisine] if cuisine != "Various" else ["Restaurant"]),
+            "mood_match": mood_match,
+            "reviews": reviews
+        }
+        restaurants.append(restaurant)
+    
+    return {
+        "success": True,
+        "location": location,
+        "mood": mood,
+        "total_restaurants": len(restaurants),
+        "restaurants": restaurants,
+        "timestamp": datetime.now().isoformat()
+    }
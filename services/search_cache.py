@@ -0,0 +1,85 @@
+"""
+In-memory cache for restaurant search results.
+Keeps recent agent results keyed by normalized (location, mood) and
+collapses concurrent identical searches into a single upstream call.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+class SearchCache:
+    """Caches successful search results for a limited time, evicting least recently used first."""
+
+    def __init__(self, ttl_seconds: int = 300, max_entries: int = 1024):
+        self.entries: "OrderedDict[Tuple[str, str], Tuple[float, dict]]" = OrderedDict()
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        # key -> [lock, waiter count] for searches currently in flight
+        self.pending: Dict[Tuple[str, str], list] = {}
+
+    @staticmethod
+    def make_key(location: str, mood: str) -> Tuple[str, str]:
+        """Normalize a search into a cache key."""
+        return location.strip().lower(), mood.strip().lower()
+
+    def get(self, location: str, mood: str) -> Optional[dict]:
+        """Get a cached result, or None if missing or expired."""
+        key = self.make_key(location, mood)
+        with self.lock:
+            entry = self.entries.get(key)
+            if not entry:
+                return None
+            expires_at, result = entry
+            if time.monotonic() >= expires_at:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return result
+
+    def set(self, location: str, mood: str, result: dict):
+        """Store a result, evicting the least recently used entries when full."""
+        key = self.make_key(location, mood)
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = (time.monotonic() + self.ttl_seconds, result)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def get_or_compute(self, location: str, mood: str, compute: Callable[[], dict]) -> dict:
+        """
+        Get a cached result or compute it. Concurrent callers for the same key
+        wait for the first one instead of repeating the search.
+        Only successful results with at least one restaurant are cached.
+        """
+        result = self.get(location, mood)
+        if result is not None:
+            return result
+
+        key = self.make_key(location, mood)
+        with self.lock:
+            waiter = self.pending.get(key)
+            if waiter is None:
+                waiter = self.pending[key] = [threading.Lock(), 0]
+            waiter[1] += 1
+
+        try:
+            with waiter[0]:
+                # Another caller may have finished the search while we waited
+                result = self.get(location, mood)
+                if result is not None:
+                    return result
+                result = compute()
+                if result.get("success") and result.get("total_restaurants", 0) > 0:
+                    self.set(location, mood, result)
+                return result
+        finally:
+            with self.lock:
+                waiter[1] -= 1
+                if waiter[1] == 0:
+                    del self.pending[key]
+
+# Global search cache instance
+search_cache = SearchCache(ttl_seconds=300)
@@ -1,17 +1,14 @@
-import random
-import string
+import base64
+import secrets
 
-def generate_room_id(existing_rooms):
+def generate_room_id():
     """
-    Generate a unique 6-character room ID.
+    Generate a random 6-character room ID.
     
-    Args:
-        existing_rooms (set): Set of existing room IDs to avoid duplicates
+    Uses 30 random bits (base32, A-Z and 2-7), so collisions are negligible
+    and no record of previously issued IDs is needed.
         
     Returns:
-        str: A unique 6-character room ID
+        str: A random 6-character room ID
     """
-    while True:
-        room_id = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-        if room_id not in existing_rooms:
-            return room_id
+    return base64.b32encode(secrets.token_bytes(4)).decode('ascii')[:6]
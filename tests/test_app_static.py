@@ -0,0 +1,48 @@
+"""Tests for serving the built React app from app.py."""
+
+import pytest
+
+import app as app_module
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # Don't start the Azure warm-up thread from the test requests
+    monkeypatch.setattr(app_module, 'azure_warm_up_started', True)
+    return app_module.app.test_client()
+
+
+def built_asset():
+    assets = sorted(path for path in app_module.STATIC_FILES if path.startswith('assets/'))
+    if not assets:
+        pytest.skip('frontend has not been built')
+    return assets[0]
+
+
+def test_hashed_assets_are_cached_for_a_year(client):
+    response = client.get('/' + built_asset())
+    assert response.status_code == 200
+    assert response.cache_control.max_age == app_module.ASSET_MAX_AGE
+    assert response.cache_control.public
+
+
+def test_listed_asset_is_served_directly(client):
+    path = built_asset()
+    response = client.get('/' + path)
+    with open(f'{app_module.FRONTEND_DIST}/{path}', 'rb') as f:
+        assert response.data == f.read()
+
+
+def test_unknown_path_falls_back_to_index(client):
+    response = client.get('/lobby/ABC123')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/html'
+    assert response.data == app_module.INDEX_HTML
+    assert response.headers['Cache-Control'] == 'no-cache'
+
+
+def test_asset_removed_after_startup_falls_back_to_index(client, monkeypatch):
+    monkeypatch.setattr(app_module, 'STATIC_FILES', app_module.STATIC_FILES | {'assets/gone.js'})
+    response = client.get('/assets/gone.js')
+    assert response.status_code == 200
+    assert response.data == app_module.INDEX_HTML
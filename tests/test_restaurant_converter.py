@@ -0,0 +1,27 @@
+"""Tests for services.restaurant_converter."""
+
+import pytest
+
+from services.restaurant_converter import convert_azure_to_ui_format
+
+
+def convert(restaurant):
+    return convert_azure_to_ui_format({
+        "success": True,
+        "json_data": [restaurant],
+        "location": "Raleigh, NC",
+        "mood": "cozy",
+    })
+
+
+@pytest.mark.parametrize("price", ["$", "$$$$"])
+def test_valid_price_is_kept(price):
+    result = convert({"name": "Thai Palace", "price_range": price})
+    assert result["restaurants"][0]["price_range"] == price
+
+
+@pytest.mark.parametrize("price", [["$$"], {"level": 2}, 3, "cheap"])
+def test_invalid_price_falls_back(price):
+    result = convert({"name": "Thai Palace", "price_range": price})
+    assert result["success"]
+    assert result["restaurants"][0]["price_range"] == "$$"
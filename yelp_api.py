@@ -1,6 +1,8 @@
 import requests
 import argparse
+import asyncio
 import os
+import aiohttp
 from dotenv import load_dotenv
 
 # Load environment variables from config.env file
@@ -13,21 +15,38 @@ if not API_KEY:
 
 ENDPOINT = "https://api.yelp.com/v3/businesses/search"
 
-def get_restaurants(location, limit=10):
-    headers = {"Authorization": f"Bearer {API_KEY}"}
-    params = {
+# Shared session so repeated calls reuse the keep-alive connection to Yelp
+session = requests.Session()
+session.headers["Authorization"] = f"Bearer {API_KEY}"
+
+def _search_params(location, limit):
+    return {
         "term": "restaurants",
         "location": location,
         "limit": limit,
         "sort_by": "rating"  # could also use "best_match" or "review_count"
     }
-    
-    response = requests.get(ENDPOINT, headers=headers, params=params)
+
+def get_restaurants(location, limit=10):
+    response = session.get(ENDPOINT, params=_search_params(location, limit))
     
     if response.status_code != 200:
         raise Exception(f"API error: {response.status_code} - {response.text}")
     
-    data = response.json()
+    return _parse_businesses(response.json())
+
+async def get_restaurants_many(locations, limit=10):
+    """Search several locations concurrently; returns one result list per location, in order."""
+    async with aiohttp.ClientSession(headers={"Authorization": f"Bearer {API_KEY}"}) as client:
+        async def fetch(location):
+            async with client.get(ENDPOINT, params=_search_params(location, limit)) as response:
+                if response.status != 200:
+                    raise Exception(f"API error: {response.status} - {await response.text()}")
+                return _parse_businesses(await response.json())
+        
+        return await asyncio.gather(*(fetch(location) for location in locations))
+
+def _parse_businesses(data):
     businesses = data.get("businesses", [])
     
     results = []